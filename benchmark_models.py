@@ -0,0 +1,288 @@
+"""
+Model Variant Benchmark for Finance Bot
+Compares accuracy and CPU latency of the full, ONNX and int8-quantized variants of each
+task model, and saves measured p90 latencies for the runtime model selector
+
+Usage:
+    python benchmark_models.py                                   # every available variant
+    python benchmark_models.py --tasks classification,sentiment --samples 200
+    python benchmark_models.py --mock --write-timings            # include the remote variant via the stand-in
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmark_suite import RESULTS_DIR, _git_rev
+from finance_analytics import CATEGORIES
+from mock_hf_api import MockConfig, MockHFServer
+from model_variants import (TIMINGS_PATH, VARIANTS, LatencyTracker, LocalRunner, ModelSelector,
+                            ModelVariant, backend_available)
+from synthetic_data import generate_chat_history, generate_transactions
+
+SENTIMENT_SAMPLES = [
+    ("Quarterly revenue beat expectations and margins widened", 'positive'),
+    ("The company raised its full-year dividend by 10%", 'positive'),
+    ("My savings grew steadily after I cut dining out", 'positive'),
+    ("Strong job growth lifted consumer spending", 'positive'),
+    ("The firm missed earnings estimates and cut guidance", 'negative'),
+    ("Credit card debt keeps rising and I missed a payment", 'negative'),
+    ("Shares fell sharply after the fraud investigation was announced", 'negative'),
+    ("Overdraft fees wiped out this month's budget", 'negative'),
+    ("The board will meet on Tuesday to review the budget", 'neutral'),
+    ("The bank publishes its annual report in March", 'neutral'),
+    ("I moved my checking account to a different branch", 'neutral'),
+    ("Interest rates were left unchanged at the meeting", 'neutral'),
+]
+
+QA_SAMPLES = [
+    ("How much should an emergency fund cover?",
+     "Most planners suggest an emergency fund that covers three to six months of expenses.",
+     "three to six months"),
+    ("What share of income goes to needs under the 50/30/20 rule?",
+     "The 50/30/20 rule puts 50% of income toward needs, 30% toward wants and 20% toward savings.",
+     "50%"),
+    ("Which debts should be paid off first with the avalanche method?",
+     "The avalanche method pays off the debts with the highest interest rate first.",
+     "the debts with the highest interest rate"),
+    ("What kind of funds have low fees?",
+     "Index funds track a market index and usually have lower fees than actively managed funds.",
+     "Index funds"),
+]
+
+
+def _percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _rouge1_f(candidate: str, reference: str) -> float:
+    """Unigram overlap F1, used as agreement with the largest variant's summaries"""
+    cand, ref = candidate.lower().split(), reference.lower().split()
+    if not cand or not ref:
+        return 0.0
+    counts: Dict[str, int] = {}
+    for word in ref:
+        counts[word] = counts.get(word, 0) + 1
+    overlap = 0
+    for word in cand:
+        if counts.get(word, 0) > 0:
+            counts[word] -= 1
+            overlap += 1
+    if not overlap:
+        return 0.0
+    precision, recall = overlap / len(cand), overlap / len(ref)
+    return 2 * precision * recall / (precision + recall)
+
+
+def build_eval_sets(samples: int) -> Dict[str, List[Tuple[Dict[str, Any], Any]]]:
+    """(payload, expected) pairs per task, with payloads shaped like HuggingFaceService sends them"""
+    transactions = generate_transactions(samples, seed=7)
+    transcript = '\n\n'.join(f"{m['role']}: {m['content']}." for m in generate_chat_history(12))
+    return {
+        'classification': [
+            ({'inputs': f"{t['merchant']} {t['notes']}".strip(), 'parameters': {'candidate_labels': CATEGORIES}},
+             t['category'])
+            for t in transactions
+        ],
+        'sentiment': [({'inputs': text}, label) for text, label in SENTIMENT_SAMPLES],
+        'question_answering': [
+            ({'inputs': {'question': q, 'context': c}}, answer) for q, c, answer in QA_SAMPLES
+        ],
+        'summarization': [
+            ({'inputs': transcript, 'parameters': {'max_length': 100, 'min_length': 30, 'do_sample': False}}, None)
+        ],
+        'text_generation': [
+            ({'inputs': f"Financial Query: {q}\nContext: \nAdvice:",
+              'parameters': {'max_length': 200, 'do_sample': False, 'pad_token_id': 50256}}, None)
+            for q, _, _ in QA_SAMPLES
+        ],
+    }
+
+
+def _prediction(task: str, response: Any) -> Optional[str]:
+    if not response:
+        return None
+    if task == 'classification':
+        return response['labels'][0]
+    if task == 'sentiment':
+        first = response[0]
+        return (first[0] if isinstance(first, list) else first)['label'].lower()
+    if task == 'question_answering':
+        return response['answer']
+    if task == 'summarization':
+        return response[0]['summary_text']
+    return response[0]['generated_text']
+
+
+def _score(task: str, prediction: Optional[str], expected: Any, reference: Optional[str]) -> Optional[float]:
+    """1/0 accuracy for labelled tasks, ROUGE-1 agreement with the reference variant otherwise"""
+    if prediction is None:
+        return 0.0
+    if task in ('classification', 'sentiment'):
+        return float(prediction.lower() == str(expected).lower())
+    if task == 'question_answering':
+        a, b = prediction.lower().strip(' .'), str(expected).lower()
+        return float(bool(a) and (a in b or b in a))
+    if task == 'summarization' and reference is not None:
+        return _rouge1_f(prediction, reference)
+    # Generated advice has no reference to compare against; report latency only
+    return None
+
+
+def bench_variant(variant: ModelVariant, call: Callable[[Dict[str, Any]], Any],
+                  cases: List[Tuple[Dict[str, Any], Any]], references: Optional[List[Optional[str]]],
+                  warmup: int) -> Dict[str, Any]:
+    """Latency of each case plus the mean accuracy (or agreement) over all cases"""
+    started = time.perf_counter()
+    for payload, _ in cases[:warmup]:
+        call(payload)
+    load_ms = (time.perf_counter() - started) * 1000
+
+    latencies, scores, predictions = [], [], []
+    for i, (payload, expected) in enumerate(cases):
+        start = time.perf_counter()
+        response = call(payload)
+        latencies.append((time.perf_counter() - start) * 1000)
+        prediction = _prediction(variant.task, response)
+        predictions.append(prediction)
+        score = _score(variant.task, prediction, expected, references[i] if references else None)
+        if score is not None:
+            scores.append(score)
+
+    return {
+        'task': variant.task,
+        'variant': variant.name,
+        'model': variant.model_id,
+        'backend': variant.backend,
+        'samples': len(cases),
+        'warmup_ms': load_ms,
+        'median_ms': _percentile(latencies, 0.5),
+        'p90_ms': _percentile(latencies, 0.9),
+        'max_ms': max(latencies),
+        'quality': sum(scores) / len(scores) if scores else None,
+        '_predictions': predictions
+    }
+
+
+def run_benchmarks(args: argparse.Namespace, remote_url: Optional[str]) -> List[Dict[str, Any]]:
+    from huggingface_service import HuggingFaceService
+
+    service = HuggingFaceService()
+    remote_available = service.has_api_key()
+    if remote_url:
+        service.api_key = 'benchmark'
+        service.base_url = remote_url
+        service.loading_retry_delay = service.error_retry_delay = 0.01
+        remote_available = True
+
+    runner = LocalRunner()
+    eval_sets = build_eval_sets(args.samples)
+    tasks = [t.strip() for t in args.tasks.split(',') if t.strip()] if args.tasks else list(VARIANTS)
+    results = []
+
+    for task in tasks:
+        cases = eval_sets[task]
+        references: Optional[List[Optional[str]]] = None
+        print(f"{task} ({len(cases)} samples)")
+        for variant in VARIANTS[task]:
+            if variant.is_local and not backend_available(variant.backend):
+                print(f"  {variant.name:<24} skipped: {variant.backend} runtime not installed")
+                continue
+            if not variant.is_local and not remote_available:
+                print(f"  {variant.name:<24} skipped: no API key (use --mock)")
+                continue
+
+            if variant.is_local:
+                def call(payload, variant=variant):
+                    return runner.run(variant, payload)
+            else:
+                def call(payload, task=task):
+                    return service._make_request(service.models[task], payload)
+
+            try:
+                result = bench_variant(variant, call, cases, references, args.warmup)
+            except Exception as e:
+                print(f"  {variant.name:<24} failed: {e}")
+                continue
+            predictions = result.pop('_predictions')
+            if references is None:
+                # The largest variant that ran is the reference for agreement scores
+                references = predictions
+            quality = '     n/a' if result['quality'] is None else f"{result['quality']:8.3f}"
+            print(f"  {variant.name:<24} median {result['median_ms']:9.1f} ms  p90 {result['p90_ms']:9.1f} ms"
+                  f"  quality {quality}")
+            results.append(result)
+    return results
+
+
+def report_selection(results: List[Dict[str, Any]], budgets: Dict[str, float]) -> Dict[str, str]:
+    """Variant the runtime selector would choose per task from these measurements"""
+    # Each result is already a p90 over many runs
+    tracker = LatencyTracker(path=None, min_samples=1)
+    for result in results:
+        tracker.record(f"{result['task']}:{result['variant']}", result['p90_ms'])
+    measured = {f"{r['task']}:{r['variant']}" for r in results}
+    variants = {task: [v for v in group if v.key in measured] for task, group in VARIANTS.items()}
+    selector = ModelSelector(variants, tracker, enable_local=True, budgets=budgets)
+
+    chosen = {}
+    print("\nSelected variants")
+    for task in variants:
+        variant = selector.select(task, probe=False)
+        if variant:
+            chosen[task] = variant.name
+            print(f"  {task:<20} budget {selector.budget(task):7.0f} ms -> {variant.name}")
+    return chosen
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare model variants for accuracy and latency")
+    parser.add_argument('--tasks', help=f"comma separated subset of {','.join(VARIANTS)}")
+    parser.add_argument('--samples', type=int, default=100, help="labelled transactions for classification")
+    parser.add_argument('--warmup', type=int, default=1, help="untimed calls per variant (model load/export)")
+    parser.add_argument('--mock', action='store_true', help="benchmark the remote variant against the stand-in")
+    parser.add_argument('--latency-ms', type=float, default=25.0, help="stand-in latency with --mock")
+    parser.add_argument('--budget', action='append', default=[], metavar='TASK=MS',
+                        help="latency budget override for the selection report")
+    parser.add_argument('--write-timings', action='store_true',
+                        help=f"save p90 latencies to {TIMINGS_PATH} for the runtime selector")
+    parser.add_argument('--output-dir', default=RESULTS_DIR)
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    budgets = {task: float(ms) for task, ms in (b.split('=', 1) for b in args.budget)}
+    started = datetime.now()
+    if args.mock:
+        with MockHFServer(MockConfig(args.latency_ms, args.latency_ms / 5)) as server:
+            results = run_benchmarks(args, server.url)
+    else:
+        results = run_benchmarks(args, None)
+    chosen = report_selection(results, budgets)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"models_{started.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'run': {'started': started.isoformat(timespec='seconds'), 'git_rev': _git_rev(), 'args': vars(args)},
+            'results': results,
+            'selected': chosen
+        }, f, indent=2)
+    print(f"\nResults written to {path}")
+
+    if args.write_timings:
+        # Stand-in latencies say nothing about the real API, so only local timings are kept
+        timings = {f"{r['task']}:{r['variant']}": r['p90_ms'] for r in results
+                   if not (args.mock and r['backend'] == 'remote')}
+        print(f"Timings written to {LatencyTracker(path=None).save(timings, TIMINGS_PATH)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
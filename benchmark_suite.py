@@ -0,0 +1,272 @@
+"""
+Benchmark Suite for Finance Bot
+Times the app's hot paths on synthetic data and a local Hugging Face stand-in,
+storing results as JSON so runs can be compared for regressions
+
+Usage:
+    python benchmark_suite.py                       # 1k and 100k, compare with the last run
+    python benchmark_suite.py --scales 1k,100k,1m --latency-ms 100 --loading-rate 0.05
+    python benchmark_suite.py --only filter --compare benchmark_results/bench_20240101-120000.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from budgets import Budget, BudgetEngine
+from category_model import CategoryModel
+from currency import FxRateTable, to_reporting_currency
+from finance_analytics import (CATEGORIES, apply_transaction_filters, export_data_json, keyword_category,
+                               parse_import_data, spending_insights, suggest_category)
+from intent_router import answer_query, parse_query, prepare_frame
+from mock_hf_api import MockConfig, MockHFServer
+from synthetic_data import generate_chat_history, generate_dataset, parse_scale
+
+RESULTS_DIR = 'benchmark_results'
+CHAT_DATA_QUESTIONS = [
+    "How much did I spend on food last month?",
+    "How many transactions did I have this year?",
+    "What was my biggest shopping expense in March?",
+    "Which category did I spend the most on in the last 30 days?",
+    "Average transport cost last week?",
+]
+
+
+def measure(func: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Wall-clock statistics in milliseconds over ``repeat`` calls"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        'repeat': repeat,
+        'min_ms': samples[0],
+        'median_ms': statistics.median(samples),
+        'mean_ms': statistics.fmean(samples),
+        'p95_ms': samples[min(len(samples) - 1, int(round(0.95 * (len(samples) - 1))))],
+        'max_ms': samples[-1]
+    }
+
+
+class BenchmarkRun:
+    def __init__(self, args: argparse.Namespace):
+        self.started = datetime.now()
+        self.args = vars(args)
+        self.results: List[Dict[str, Any]] = []
+
+    def record(self, name: str, scale: str, stats: Dict[str, float], items: int = 1, **extra) -> None:
+        result = {'name': name, 'scale': scale, 'items': items, **stats, **extra}
+        if items > 1:
+            result['per_item_us'] = stats['median_ms'] * 1000 / items
+        self.results.append(result)
+        print(f"  {name:<32} {scale:>12}  median {stats['median_ms']:10.3f} ms  p95 {stats['p95_ms']:10.3f} ms")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'run': {
+                'started': self.started.isoformat(timespec='seconds'),
+                'git_rev': _git_rev(),
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'platform': platform.platform(),
+                'args': self.args
+            },
+            'results': self.results
+        }
+
+    def save(self, output_dir: str) -> str:
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"bench_{self.started.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        return path
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _repeats_for(count: int, repeat: int) -> int:
+    # Million-row passes take seconds each; one sample is enough to spot regressions
+    return repeat if count <= 100_000 else 1
+
+
+def bench_local(run: BenchmarkRun, scale: str, repeat: int, only: Optional[str]) -> None:
+    """Analytics, categorization, filters and export/import over synthetic data"""
+    from huggingface_service import HuggingFaceService
+
+    count = parse_scale(scale)
+    repeat = _repeats_for(count, repeat)
+    data = generate_dataset(scale)
+    transactions = data['transactions']
+    df = pd.DataFrame(transactions)
+    # No key: a low-confidence suggestion falls through to keywords, never the real API
+    service = HuggingFaceService()
+    service.api_key = None
+    texts = [f"{t['merchant']} {t['notes']}".strip() for t in transactions]
+    labels = [t['category'] for t in transactions]
+    model = CategoryModel(path=None)
+    model.learn_many(texts, labels)
+    exported = export_data_json(transactions, data['goals'], data['user_profile'])
+    max_amount = int(df['amount'].max())
+    budgets = [Budget(category, period, 500.0) for category in CATEGORIES for period in ('weekly', 'monthly')]
+    fx_table = FxRateTable.load(user_path=None)
+    # A third of the history in other currencies, spread over the rate table's currencies
+    mixed_df = df.assign(currency=[fx_table.currencies[i % len(fx_table.currencies)] if i % 3 == 0 else 'USD'
+                                   for i in range(len(df))])
+    chat_frame = prepare_frame(df)
+    chat_queries = [parse_query(q, CATEGORIES) for q in CHAT_DATA_QUESTIONS]
+
+    benches = [
+        ('dataframe_build', lambda: pd.DataFrame(transactions), count),
+        ('get_financial_insights', lambda: service.get_financial_insights(transactions), count),
+        ('generate_ai_insights', lambda: spending_insights(df), count),
+        ('suggest_category',
+         lambda: [suggest_category(t['merchant'], t['notes'], model=model, service=service) for t in transactions],
+         count),
+        ('keyword_category', lambda: [keyword_category(t['merchant'], t['notes']) for t in transactions], count),
+        ('category_model_learn', lambda: CategoryModel(path=None).learn_many(texts, labels), count),
+        ('category_model_predict_batch', lambda: model.predict_many(texts), count),
+        ('budget_add_transaction', lambda: BudgetEngine(budgets).add_many(transactions), count),
+        ('budget_reevaluate', lambda: BudgetEngine(budgets).reevaluate(df), count),
+        ('fx_to_reporting_currency', lambda: to_reporting_currency(mixed_df, 'EUR', fx_table), count),
+        ('chat_query_answer', lambda: [answer_query(q, chat_frame) for q in chat_queries], count),
+        ('filter_amount_only', lambda: apply_transaction_filters(df, [], (0, max_amount)), count),
+        ('filter_category_amount',
+         lambda: apply_transaction_filters(df, [CATEGORIES[0], CATEGORIES[6]], (10, max_amount // 2)), count),
+        ('export_json', lambda: export_data_json(transactions, data['goals'], data['user_profile']), count),
+        ('import_json', lambda: parse_import_data(exported.encode('utf-8')), count),
+    ]
+    for name, func, items in benches:
+        if only and only not in name:
+            continue
+        run.record(name, scale, measure(func, repeat), items=items)
+
+
+def bench_remote(run: BenchmarkRun, config: MockConfig, calls: int, scenario: str,
+                 only: Optional[str]) -> None:
+    """Hugging Face request paths against the local stand-in"""
+    from huggingface_service import HuggingFaceService
+
+    with MockHFServer(config) as server:
+        service = HuggingFaceService()
+        service.api_key = 'benchmark'
+        service.base_url = server.url
+        # Keep retry back-off proportional to the mock's latency instead of real-world seconds
+        service.loading_retry_delay = max(0.01, config.latency_ms / 1000)
+        service.error_retry_delay = max(0.01, config.latency_ms / 1000)
+
+        model = service.models['text_generation']
+        payload = {'inputs': 'How should I budget?', 'parameters': {'max_length': 200}}
+        transcript = '\n\n'.join(f"{m['role']}: {m['content']}." for m in generate_chat_history(300))
+        edited = transcript + '\n\nuser: One more question about my budget.'
+
+        def summarize_cold():
+            service.summarizer.cache.clear()
+            return service.summarize_text(transcript)
+
+        benches = [
+            ('_make_request', lambda: [service._make_request(model, payload) for _ in range(calls)]),
+            ('classify_expense',
+             lambda: [service.classify_expense('Starbucks Coffee downtown', CATEGORIES) for _ in range(calls)]),
+            ('summarize_text_cold', summarize_cold),
+            ('summarize_text_edited', lambda: service.summarize_text(edited)),
+        ]
+        for name, func in benches:
+            if only and only not in name:
+                continue
+            items = 1 if name.startswith('summarize') else calls
+            run.record(name, scenario, measure(func, repeat=3, warmup=0), items=items,
+                       server=dict(server.stats))
+
+
+def compare(current: Dict[str, Any], baseline_path: str, threshold: float) -> int:
+    """Print median deltas against a previous run; returns the number of regressions"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {(r['name'], r['scale']): r for r in baseline.get('results', [])}
+
+    regressions = 0
+    print(f"\nComparison with {baseline_path} (threshold {threshold:.0%})")
+    for result in current['results']:
+        old = previous.get((result['name'], result['scale']))
+        if not old or not old['median_ms']:
+            continue
+        change = (result['median_ms'] - old['median_ms']) / old['median_ms']
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"  {result['name']:<32} {result['scale']:>12}  {old['median_ms']:10.3f} -> "
+              f"{result['median_ms']:10.3f} ms  ({change:+.1%}){flag}")
+    return regressions
+
+
+def _latest_result(output_dir: str) -> Optional[str]:
+    paths = sorted(glob.glob(os.path.join(output_dir, 'bench_*.json')))
+    return paths[-1] if paths else None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Finance Bot benchmark suite")
+    parser.add_argument('--scales', default='1k,100k', help="comma separated: 1k,100k,1m or row counts")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', help="run benchmarks whose name contains this text")
+    parser.add_argument('--skip-remote', action='store_true', help="skip the mock Hugging Face benchmarks")
+    parser.add_argument('--hf-calls', type=int, default=20, help="requests per remote benchmark sample")
+    parser.add_argument('--latency-ms', type=float, default=25.0)
+    parser.add_argument('--jitter-ms', type=float, default=5.0)
+    parser.add_argument('--loading-rate', type=float, default=0.05, help="503 rate for the degraded scenario")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.05, help="429 rate for the degraded scenario")
+    parser.add_argument('--output-dir', default=RESULTS_DIR)
+    parser.add_argument('--compare', help="baseline JSON (defaults to the newest run in --output-dir)")
+    parser.add_argument('--threshold', type=float, default=0.2, help="median slowdown flagged as regression")
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    baseline = args.compare or _latest_result(args.output_dir)
+    run = BenchmarkRun(args)
+
+    for scale in [s.strip() for s in args.scales.split(',') if s.strip()]:
+        print(f"Local benchmarks at {scale}")
+        bench_local(run, scale, args.repeat, args.only)
+
+    if not args.skip_remote:
+        scenarios = [
+            ('hf_clean', MockConfig(args.latency_ms, args.jitter_ms)),
+            ('hf_degraded', MockConfig(args.latency_ms, args.jitter_ms,
+                                       args.loading_rate, args.rate_limit_rate)),
+        ]
+        for scenario, config in scenarios:
+            print(f"Remote benchmarks ({scenario})")
+            bench_remote(run, config, args.hf_calls, scenario, args.only)
+
+    path = run.save(args.output_dir)
+    print(f"\nResults written to {path}")
+
+    regressions = 0
+    if baseline and os.path.exists(baseline):
+        regressions = compare(run.to_dict(), baseline, args.threshold)
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""
+Category Budgets for Finance Bot
+Per-category weekly, monthly and yearly spending limits whose running totals are updated
+in O(1) per transaction, raising alerts as spending crosses each threshold
+"""
+
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from currency import DEFAULT_CURRENCY, format_money
+from lazy_imports import lazy_import
+from perf_metrics import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import('pandas')
+
+PERIODS = ('weekly', 'monthly', 'yearly')
+PERIOD_NOUNS = {'weekly': 'week', 'monthly': 'month', 'yearly': 'year'}
+# Share of the limit at which an alert is raised; 1.0 means over budget
+DEFAULT_THRESHOLDS = (0.8, 1.0)
+
+# (category, period, period key such as '2024-05', '2024-W19' or '2024')
+SpendKey = Tuple[str, str, str]
+
+
+def _as_date(value: Any) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def format_period_code(code: int, period: str) -> str:
+    """Period key for an integer code from ``period_codes``"""
+    if period == 'weekly':
+        return f"{code // 100:04d}-W{code % 100:02d}"
+    if period == 'monthly':
+        return f"{code // 100:04d}-{code % 100:02d}"
+    return f"{code:04d}"
+
+
+def period_key(value: Any, period: str) -> str:
+    """Calendar bucket of a transaction date; weeks are ISO weeks"""
+    d = _as_date(value)
+    if period == 'weekly':
+        year, week, _ = d.isocalendar()
+        return format_period_code(year * 100 + week, period)
+    if period == 'monthly':
+        return format_period_code(d.year * 100 + d.month, period)
+    if period == 'yearly':
+        return format_period_code(d.year, period)
+    raise ValueError(f"Unknown budget period: {period}")
+
+
+def period_codes(dates: 'pd.Series', period: str) -> 'pd.Series':
+    """Vectorized integer form of ``period_key`` (e.g. 202405); only group keys get formatted"""
+    if period == 'weekly':
+        iso = dates.dt.isocalendar()
+        return iso['year'].astype('int64') * 100 + iso['week'].astype('int64')
+    if period == 'monthly':
+        return dates.dt.year * 100 + dates.dt.month
+    if period == 'yearly':
+        return dates.dt.year
+    raise ValueError(f"Unknown budget period: {period}")
+
+
+class Budget:
+    def __init__(self, category: str, period: str, limit: float,
+                 thresholds: Sequence[float] = DEFAULT_THRESHOLDS):
+        if period not in PERIODS:
+            raise ValueError(f"Unknown budget period: {period}")
+        if limit <= 0:
+            raise ValueError("Budget limit must be positive")
+        self.category = category
+        self.period = period
+        self.limit = float(limit)
+        self.thresholds = tuple(sorted(thresholds))
+
+    def level(self, spent: float) -> float:
+        """Highest threshold reached by ``spent`` (0.0 if none)"""
+        ratio = spent / self.limit
+        reached = [t for t in self.thresholds if ratio >= t]
+        return reached[-1] if reached else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'category': self.category, 'period': self.period, 'limit': self.limit,
+                'thresholds': list(self.thresholds)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Budget':
+        return cls(data['category'], data['period'], data['limit'],
+                   data.get('thresholds') or DEFAULT_THRESHOLDS)
+
+
+class BudgetEngine:
+    """
+    Running spend per (category, period, period key) for categories with a budget.
+    ``add_transaction`` touches at most one total per budgeted period of the
+    transaction's category; ``reevaluate`` rebuilds totals for a whole history with
+    one grouped sum per period when budgets change or data is imported.
+    """
+
+    def __init__(self, budgets: Iterable[Budget] = (), currency: str = DEFAULT_CURRENCY):
+        # Limits and the amounts passed in are in this (reporting) currency
+        self.currency = currency
+        self.budgets: Dict[Tuple[str, str], Budget] = {}
+        self.spent: Dict[SpendKey, float] = {}
+        # Highest threshold already alerted per spend key, so each crossing alerts once
+        self._alerted: Dict[SpendKey, float] = {}
+        for budget in budgets:
+            self.budgets[(budget.category, budget.period)] = budget
+
+    def _category_budgets(self, category: str) -> List[Budget]:
+        return [self.budgets[(category, p)] for p in PERIODS if (category, p) in self.budgets]
+
+    def _check(self, budget: Budget, key: SpendKey) -> Optional[Dict[str, Any]]:
+        spent = self.spent.get(key, 0.0)
+        level = budget.level(spent)
+        if level <= self._alerted.get(key, 0.0):
+            return None
+        self._alerted[key] = level
+        return {
+            'category': budget.category,
+            'period': budget.period,
+            'period_key': key[2],
+            'threshold': level,
+            'spent': spent,
+            'limit': budget.limit
+        }
+
+    def add_transaction(self, transaction: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Add one transaction to the running totals; returns any thresholds it crossed"""
+        budgets = self._category_budgets(transaction.get('category'))
+        if not budgets:
+            return []
+        amount = float(transaction.get('amount') or 0)
+        alerts = []
+        for budget in budgets:
+            key = (budget.category, budget.period, period_key(transaction['date'], budget.period))
+            self.spent[key] = self.spent.get(key, 0.0) + amount
+            alert = self._check(budget, key)
+            if alert:
+                alerts.append(alert)
+        return alerts
+
+    def add_many(self, transactions: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        alerts = []
+        for transaction in transactions:
+            alerts.extend(self.add_transaction(transaction))
+        return alerts
+
+    @timed
+    def reevaluate(self, df: Optional['pd.DataFrame'], budgets: Optional[Iterable[Budget]] = None) -> None:
+        """
+        Recompute totals for ``budgets`` (default: all) from a transactions frame.
+        Thresholds already reached in the history are marked as alerted without
+        raising alerts, so only new crossings are reported afterwards.
+        """
+        budgets = list(self.budgets.values() if budgets is None else budgets)
+        targets = {(b.category, b.period) for b in budgets}
+        self.spent = {k: v for k, v in self.spent.items() if k[:2] not in targets}
+        self._alerted = {k: v for k, v in self._alerted.items() if k[:2] not in targets}
+        if df is None or df.empty or 'date' not in df or not budgets:
+            return
+
+        dates = pd.to_datetime(df['date'], errors='coerce')
+        amounts = pd.to_numeric(df['amount'], errors='coerce').fillna(0.0)
+        for period in {b.period for b in budgets}:
+            categories = [b.category for b in budgets if b.period == period]
+            mask = df['category'].isin(categories) & dates.notna()
+            if not mask.any():
+                continue
+            codes = period_codes(dates[mask], period)
+            totals = amounts[mask].groupby([df.loc[mask, 'category'], codes]).sum()
+            for (category, code), total in totals.items():
+                spend_key = (category, period, format_period_code(int(code), period))
+                self.spent[spend_key] = float(total)
+                self._alerted[spend_key] = self.budgets[(category, period)].level(float(total))
+
+    def set_budget(self, budget: Budget, df: Optional['pd.DataFrame'] = None) -> None:
+        """Add or change a budget; a new budget is evaluated against ``df`` (the full history)"""
+        existing = self.budgets.get((budget.category, budget.period))
+        self.budgets[(budget.category, budget.period)] = budget
+        if existing is None:
+            self.reevaluate(df, [budget])
+            return
+        # Totals are unchanged; only the alert levels depend on the limit
+        for key, spent in self.spent.items():
+            if key[:2] == (budget.category, budget.period):
+                self._alerted[key] = budget.level(spent)
+
+    def change_currency(self, currency: str, rate: float, df: Optional['pd.DataFrame'] = None) -> None:
+        """Switch to ``currency``: limits are multiplied by ``rate`` and totals rebuilt from ``df``"""
+        for budget in self.budgets.values():
+            budget.limit = round(budget.limit * rate, 2)
+        self.currency = currency
+        self.reevaluate(df)
+
+    def remove_budget(self, category: str, period: str) -> None:
+        self.budgets.pop((category, period), None)
+        self.spent = {k: v for k, v in self.spent.items() if k[:2] != (category, period)}
+        self._alerted = {k: v for k, v in self._alerted.items() if k[:2] != (category, period)}
+
+    def reset(self) -> None:
+        """Forget all spending (budgets are kept)"""
+        self.spent.clear()
+        self._alerted.clear()
+
+    def status(self, as_of: Any = None) -> List[Dict[str, Any]]:
+        """Spend against each budget in the period containing ``as_of`` (default today)"""
+        as_of = as_of or date.today()
+        rows = []
+        for (category, period), budget in sorted(self.budgets.items()):
+            key = period_key(as_of, period)
+            spent = self.spent.get((category, period, key), 0.0)
+            rows.append({
+                'category': category,
+                'period': period,
+                'period_key': key,
+                'limit': budget.limit,
+                'spent': spent,
+                'remaining': budget.limit - spent,
+                'used': spent / budget.limit,
+                'level': budget.level(spent)
+            })
+        return rows
+
+    def insights(self, as_of: Any = None) -> List[Dict[str, str]]:
+        """Insight cards for budgets at or over a threshold in the current period"""
+        cards = []
+        for row in self.status(as_of):
+            if not row['level']:
+                continue
+            over = row['spent'] > row['limit']
+            cards.append({
+                'emoji': '🚨' if over else '⚠️',
+                'title': f"{row['category']} budget {'exceeded' if over else 'alert'}",
+                'description': f"{format_money(row['spent'], self.currency)} of "
+                               f"{format_money(row['limit'], self.currency)} spent this "
+                               f"{PERIOD_NOUNS[row['period']]} ({row['used']:.0%})"
+            })
+        return cards
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        return [b.to_dict() for b in self.budgets.values()]
+
+    @classmethod
+    def from_list(cls, budgets: Iterable[Dict[str, Any]], currency: str = DEFAULT_CURRENCY) -> 'BudgetEngine':
+        return cls((Budget.from_dict(b) for b in budgets), currency)
+
+
+def format_alert(alert: Dict[str, Any], currency: str = DEFAULT_CURRENCY) -> str:
+    """One-line description of a budget alert or status row"""
+    return f"{alert['category']}: {format_money(alert['spent'], currency)} of " \
+           f"{format_money(alert['limit'], currency)} {alert['period']} budget " \
+           f"({alert['spent'] / alert['limit']:.0%})"
@@ -0,0 +1,176 @@
+"""
+Online Category Classifier for Finance Bot
+Multinomial naive Bayes over hashed word and character n-grams, updated incrementally
+from each confirmed expense category and persisted between runs
+"""
+
+import os
+import re
+import threading
+import zlib
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+N_FEATURES = 2 ** 16
+ALPHA = 0.1
+# Local predictions below this posterior (or for rarely seen categories) go to the remote model
+MIN_CONFIDENCE = 0.7
+MIN_CLASS_EXAMPLES = 2
+
+MODEL_PATH = os.getenv('FINANCE_BOT_CATEGORY_MODEL', 'category_model.npz')
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def hash_features(text: str, n_features: int = N_FEATURES) -> np.ndarray:
+    """Bucket ids for word unigrams, word bigrams and character trigrams of ``text``"""
+    words = _WORD_RE.findall(text.lower())
+    grams = [f"w:{w}" for w in words]
+    grams += [f"b:{a} {b}" for a, b in zip(words, words[1:])]
+    for w in words:
+        padded = f"<{w}>"
+        grams += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) % n_features for g in grams),
+                       dtype=np.int64, count=len(grams))
+
+
+class CategoryModel:
+    """
+    Incremental multinomial naive Bayes. ``learn`` is O(features) per example and
+    ``predict`` gathers only the rows for the text's features, so both run in
+    microseconds regardless of how much history the model has seen.
+    """
+
+    def __init__(self, path: Optional[str] = MODEL_PATH, n_features: int = N_FEATURES,
+                 alpha: float = ALPHA, min_confidence: float = MIN_CONFIDENCE,
+                 min_class_examples: int = MIN_CLASS_EXAMPLES):
+        self.path = path
+        self.n_features = n_features
+        self.alpha = alpha
+        self.min_confidence = min_confidence
+        self.min_class_examples = min_class_examples
+        self.classes: List[str] = []
+        self.feature_counts = np.zeros((n_features, 0), dtype=np.float64)
+        self.class_totals = np.zeros(0, dtype=np.float64)
+        self.class_examples = np.zeros(0, dtype=np.int64)
+        self.seen = np.zeros(n_features, dtype=bool)
+        self._lock = threading.Lock()
+
+    def _class_index(self, category: str) -> int:
+        if category not in self.classes:
+            self.classes.append(category)
+            self.feature_counts = np.hstack([self.feature_counts, np.zeros((self.n_features, 1))])
+            self.class_totals = np.append(self.class_totals, 0.0)
+            self.class_examples = np.append(self.class_examples, 0)
+        return self.classes.index(category)
+
+    def learn(self, text: str, category: str) -> None:
+        """Update the model with one confirmed (text, category) example"""
+        self.learn_many([text], [category])
+
+    def learn_many(self, texts: Iterable[str], categories: Iterable[str]) -> int:
+        count = 0
+        with self._lock:
+            for text, category in zip(texts, categories):
+                features = hash_features(text, self.n_features)
+                if not category or len(features) == 0:
+                    continue
+                k = self._class_index(category)
+                np.add.at(self.feature_counts[:, k], features, 1.0)
+                self.seen[features] = True
+                self.class_totals[k] += len(features)
+                self.class_examples[k] += 1
+                count += 1
+        return count
+
+    def _log_posteriors(self, rows: Sequence[np.ndarray]) -> np.ndarray:
+        """Normalized log posteriors, one row per non-empty feature array, scored in one pass"""
+        lengths = np.array([len(r) for r in rows])
+        offsets = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        log_likelihood = np.log(self.feature_counts[np.concatenate(rows)] + self.alpha)
+        log_prior = np.log(self.class_examples / self.class_examples.sum())
+        log_norm = np.log(self.class_totals + self.alpha * self.n_features)
+        scores = log_prior + np.add.reduceat(log_likelihood, offsets, axis=0) - np.outer(lengths, log_norm)
+        scores -= scores.max(axis=1, keepdims=True)
+        return scores - np.log(np.exp(scores).sum(axis=1, keepdims=True))
+
+    def predict_many(self, texts: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        """
+        (category, confidence) per text, or (None, 0.0) when none of its features have
+        been seen. Only seen features are scored, and the posterior is scaled by the share
+        of the text's features that were seen, so unfamiliar text reports low confidence.
+        """
+        hashed = [hash_features(t, self.n_features) for t in texts]
+        results: List[Tuple[Optional[str], float]] = [(None, 0.0)] * len(texts)
+        with self._lock:
+            if not self.classes:
+                return results
+            rows = [features[self.seen[features]] for features in hashed]
+            scored = [i for i, r in enumerate(rows) if len(r)]
+            if not scored:
+                return results
+            posteriors = np.exp(self._log_posteriors([rows[i] for i in scored]))
+            best = posteriors.argmax(axis=1)
+            for j, i in enumerate(scored):
+                coverage = len(rows[i]) / len(hashed[i])
+                results[i] = (self.classes[best[j]], float(posteriors[j, best[j]] * coverage))
+        return results
+
+    def predict(self, text: str) -> Tuple[Optional[str], float]:
+        return self.predict_many([text])[0]
+
+    def is_confident(self, category: Optional[str], confidence: float) -> bool:
+        """Whether a local prediction is good enough to skip the remote zero-shot model"""
+        if category is None or confidence < self.min_confidence:
+            return False
+        return self.class_examples[self.classes.index(category)] >= self.min_class_examples
+
+    def save(self, path: Optional[str] = None) -> Optional[str]:
+        """Persist counts atomically; stores only non-zero rows to keep the file small"""
+        path = path or self.path
+        if not path:
+            return None
+        with self._lock:
+            nonzero = np.flatnonzero(self.feature_counts.any(axis=1))
+            tmp_path = f"{path}.tmp.npz"
+            np.savez_compressed(
+                tmp_path,
+                classes=np.array(self.classes, dtype=str),
+                rows=nonzero,
+                counts=self.feature_counts[nonzero],
+                class_totals=self.class_totals,
+                class_examples=self.class_examples,
+                n_features=np.array(self.n_features)
+            )
+            os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str = MODEL_PATH, **kwargs) -> 'CategoryModel':
+        """Load a saved model, or return an empty one if ``path`` does not exist"""
+        if not path or not os.path.exists(path):
+            return cls(path=path, **kwargs)
+        with np.load(path) as data:
+            model = cls(path=path, n_features=int(data['n_features']), **kwargs)
+            model.classes = [str(c) for c in data['classes']]
+            model.feature_counts = np.zeros((model.n_features, len(model.classes)))
+            model.feature_counts[data['rows']] = data['counts']
+            model.seen[data['rows']] = True
+            model.class_totals = data['class_totals'].astype(np.float64)
+            model.class_examples = data['class_examples'].astype(np.int64)
+        return model
+
+
+_model: Optional[CategoryModel] = None
+_model_lock = threading.Lock()
+
+
+def get_category_model() -> CategoryModel:
+    """Process-wide model, loaded from FINANCE_BOT_CATEGORY_MODEL on first use"""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = CategoryModel.load(MODEL_PATH)
+    return _model
@@ -0,0 +1,197 @@
+"""
+Currencies and Exchange Rates for Finance Bot
+Money formatting, a local date-indexed FX rate table and vectorized as-of conversion of
+transaction amounts into a reporting currency
+"""
+
+import os
+import threading
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any, List, Optional
+
+from lazy_imports import lazy_import
+from perf_metrics import FALLBACKS, registry
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+else:
+    np = lazy_import('numpy')
+    pd = lazy_import('pandas')
+
+# Rates are stored as units of BASE_CURRENCY per one unit of the currency
+BASE_CURRENCY = 'USD'
+DEFAULT_CURRENCY = os.getenv('FINANCE_BOT_CURRENCY', BASE_CURRENCY)
+FX_RATES_PATH = os.getenv('FINANCE_BOT_FX_RATES', 'fx_rates.csv')
+# Uploaded rates are kept apart from the bundled table and layered over it
+USER_FX_RATES_PATH = os.getenv('FINANCE_BOT_USER_FX_RATES', 'fx_rates.user.csv')
+
+CURRENCY_SYMBOLS = {
+    'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥', 'INR': '₹',
+    'CAD': 'CA$', 'AUD': 'A$', 'CHF': 'CHF ', 'MXN': 'MX$'
+}
+ZERO_DECIMAL_CURRENCIES = {'JPY'}
+
+
+def format_money(amount: float, currency: str = DEFAULT_CURRENCY) -> str:
+    """``amount`` with the currency's symbol (or code) and usual number of decimals"""
+    symbol = CURRENCY_SYMBOLS.get(currency, f"{currency} ")
+    decimals = 0 if currency in ZERO_DECIMAL_CURRENCIES else 2
+    sign = '-' if amount < 0 else ''
+    return f"{sign}{symbol}{abs(amount):,.{decimals}f}"
+
+
+class FxRateTable:
+    """
+    Dated exchange rates (date, currency, rate) read from a local CSV. A transaction
+    uses the latest rate on or before its date; dates before a currency's first rate
+    use that first rate. Rates added with ``update`` (``user_rates``) take precedence
+    and are the only rows ``save`` writes, to ``path``.
+    """
+
+    def __init__(self, rates: Optional['pd.DataFrame'] = None, path: Optional[str] = USER_FX_RATES_PATH,
+                 user_rates: Optional['pd.DataFrame'] = None):
+        self.path = path
+        self.version = 0
+        self._lock = threading.Lock()
+        empty = pd.DataFrame(columns=['date', 'currency', 'rate'])
+        self.user_rates = self._normalize(user_rates if user_rates is not None else empty)
+        self.rates = self._normalize(pd.concat([rates if rates is not None else empty, self.user_rates],
+                                               ignore_index=True))
+
+    @staticmethod
+    def _normalize(rates: 'pd.DataFrame') -> 'pd.DataFrame':
+        rates = rates[['date', 'currency', 'rate']].copy()
+        rates['date'] = pd.to_datetime(rates['date'])
+        rates['currency'] = rates['currency'].astype(str).str.upper()
+        rates['rate'] = pd.to_numeric(rates['rate'], errors='coerce')
+        rates = rates.dropna().drop_duplicates(['date', 'currency'], keep='last')
+        return rates[rates['currency'] != BASE_CURRENCY].sort_values('date', kind='stable').reset_index(drop=True)
+
+    @classmethod
+    def load(cls, path: Optional[str] = FX_RATES_PATH,
+             user_path: Optional[str] = USER_FX_RATES_PATH) -> 'FxRateTable':
+        """Load the bundled rates from ``path`` overlaid by the user's from ``user_path``; missing files are skipped"""
+        def read(p):
+            return pd.read_csv(p) if p and os.path.exists(p) else None
+        return cls(read(path), path=user_path, user_rates=read(user_path))
+
+    def save(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the user's rates to ``path`` (default: the table's user rates file)"""
+        path = path or self.path
+        if not path:
+            return None
+        tmp_path = f"{path}.tmp"
+        with self._lock:
+            out = self.user_rates.sort_values(['currency', 'date'])
+            out.assign(date=out['date'].dt.strftime('%Y-%m-%d')).to_csv(tmp_path, index=False)
+            os.replace(tmp_path, path)
+        return path
+
+    def update(self, rates: 'pd.DataFrame') -> int:
+        """Merge new (date, currency, rate) rows; later rows win. Returns the number of rows read"""
+        new = self._normalize(rates)
+        with self._lock:
+            self.user_rates = self._normalize(pd.concat([self.user_rates, new], ignore_index=True))
+            self.rates = self._normalize(pd.concat([self.rates, new], ignore_index=True))
+            self.version += 1
+        return len(new)
+
+    @property
+    def currencies(self) -> List[str]:
+        return sorted({BASE_CURRENCY, *self.rates['currency'].unique()})
+
+    def rate(self, currency: str, on: Any) -> float:
+        """Units of BASE_CURRENCY per unit of ``currency`` as of ``on``"""
+        if currency == BASE_CURRENCY:
+            return 1.0
+        series = self.rates[self.rates['currency'] == currency]
+        if series.empty:
+            raise KeyError(f"No exchange rates for {currency}")
+        on = pd.Timestamp(on if isinstance(on, (date, datetime)) else str(on)[:10])
+        i = max(0, int(np.searchsorted(series['date'].values, on.to_datetime64(), side='right')) - 1)
+        return float(series['rate'].iloc[i])
+
+    def convert(self, amount: float, from_currency: str, to_currency: str, on: Any) -> float:
+        if from_currency == to_currency:
+            return float(amount)
+        return float(amount) * self.rate(from_currency, on) / self.rate(to_currency, on)
+
+    def rates_asof(self, currencies: 'pd.Series', dates: 'pd.Series') -> 'pd.Series':
+        """Vectorized ``rate`` for aligned currency and date series; NaN for unknown currencies"""
+        left = pd.DataFrame({'currency': currencies.values, 'date': dates.values}, index=currencies.index)
+        # Undated rows use the latest rates
+        left['date'] = left['date'].fillna(self.rates['date'].max() if len(self.rates) else pd.Timestamp.now())
+        left = left.sort_values('date', kind='stable')
+        result = pd.Series(np.where(left['currency'].values == BASE_CURRENCY, 1.0, np.nan), index=left.index)
+
+        foreign = left[result.isna().values]
+        if len(foreign) and len(self.rates):
+            rates = self.rates.astype({'date': left['date'].dtype})
+            for direction in ('backward', 'forward'):
+                missing = foreign[result.loc[foreign.index].isna().values]
+                if missing.empty:
+                    break
+                merged = pd.merge_asof(missing.assign(_row=missing.index).reset_index(drop=True), rates,
+                                       on='date', by='currency', direction=direction)
+                result.loc[merged['_row'].values] = merged['rate'].values
+        return result.reindex(currencies.index)
+
+    def convert_series(self, amounts: 'pd.Series', currencies: 'pd.Series', dates: 'pd.Series',
+                       to_currency: str) -> 'pd.Series':
+        """Convert each amount from its currency to ``to_currency`` at its date"""
+        converted = amounts * self.rates_asof(currencies, dates)
+        if to_currency != BASE_CURRENCY:
+            converted = converted / self.rates_asof(pd.Series(to_currency, index=amounts.index), dates)
+        return converted
+
+
+def to_reporting_currency(df: 'pd.DataFrame', currency: str,
+                          table: Optional[FxRateTable] = None) -> 'pd.DataFrame':
+    """
+    Copy of a transactions frame with ``amount`` in ``currency``; the entered amount and
+    currency are kept in ``original_amount`` and ``currency``. Transactions without a
+    currency are treated as DEFAULT_CURRENCY, and amounts in currencies the table has no
+    rates for are left unconverted. ``table`` defaults to ``get_fx_table()``, loaded
+    only when some amount needs converting.
+    """
+    out = df.copy()
+    if out.empty:
+        return out.assign(original_amount=pd.Series(dtype=float), currency=pd.Series(dtype=str))
+    currencies = out['currency'].fillna(DEFAULT_CURRENCY) if 'currency' in out else \
+        pd.Series(DEFAULT_CURRENCY, index=out.index)
+    amounts = pd.to_numeric(out['amount'], errors='coerce').astype(float)
+    out['currency'] = currencies
+    out['original_amount'] = amounts
+    out['amount'] = amounts
+
+    foreign = (currencies != currency).values
+    if foreign.any():
+        dates = pd.to_datetime(out['date'], errors='coerce') if 'date' in out else \
+            pd.Series(pd.NaT, index=out.index)
+        table = table or get_fx_table()
+        converted = table.convert_series(amounts[foreign], currencies[foreign], dates[foreign], currency)
+        unknown = converted.isna() & amounts[foreign].notna()
+        if unknown.any():
+            registry.increment(FALLBACKS, float(unknown.sum()), kind='fx')
+        out.loc[foreign, 'amount'] = converted.fillna(amounts[foreign]).values
+    return out
+
+
+_table: Optional[FxRateTable] = None
+_table_lock = threading.Lock()
+
+
+def get_fx_table() -> FxRateTable:
+    """Process-wide rate table, loaded from FINANCE_BOT_FX_RATES and FINANCE_BOT_USER_FX_RATES on first use"""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = FxRateTable.load()
+    return _table
+
+
+def fx_table_version() -> int:
+    """Version of the process-wide table for cache keys, without loading it"""
+    return _table.version if _table is not None else 0
@@ -0,0 +1,191 @@
+"""
+Finance Analytics for Streamlit Finance Bot
+Headless spending analysis, filtering and import/export used by the app and benchmarks
+"""
+
+import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from currency import DEFAULT_CURRENCY, format_money
+from perf_metrics import CATEGORY_SOURCE, registry, timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CATEGORIES = ["Food & Dining", "Transportation", "Shopping", "Entertainment", 
+              "Bills & Utilities", "Healthcare", "Travel", "Education", "Other"]
+
+GETTING_STARTED_INSIGHT = {
+    'emoji': '💡',
+    'title': 'Getting Started',
+    'description': 'Add some transactions to get personalized AI insights about your spending patterns!'
+}
+
+
+def spending_insights(df: 'pd.DataFrame', currency: str = DEFAULT_CURRENCY) -> List[Dict[str, str]]:
+    """Insight cards for a transactions frame with amounts in ``currency``"""
+    insights = []
+    
+    if df.empty:
+        return [GETTING_STARTED_INSIGHT]
+    
+    # Analyze spending patterns
+    total_spent = df['amount'].sum()
+    avg_transaction = df['amount'].mean()
+    top_category = df.groupby('category')['amount'].sum().idxmax()
+    top_amount = df.groupby('category')['amount'].sum().max()
+    
+    # Generate insights
+    insights.append({
+        'emoji': '📊',
+        'title': 'Top Spending Category',
+        'description': f'Your highest spending is in {top_category} with {format_money(top_amount, currency)}'
+    })
+    
+    # Check for large transactions
+    large_transactions = df[df['amount'] > avg_transaction * 2]
+    if len(large_transactions) > 0:
+        insights.append({
+            'emoji': '⚠️',
+            'title': 'Large Transactions Alert',
+            'description': f'You have {len(large_transactions)} unusually large transactions this period'
+        })
+    
+    # Spending trend
+    if len(df) >= 3:
+        recent_avg = df.tail(3)['amount'].mean()
+        if recent_avg > avg_transaction * 1.2:
+            insights.append({
+                'emoji': '📈',
+                'title': 'Spending Trend',
+                'description': 'Your recent spending is above average. Consider reviewing your budget.'
+            })
+        else:
+            insights.append({
+                'emoji': '🎉',
+                'title': 'Great Job!',
+                'description': 'Your recent spending is well controlled!'
+            })
+    
+    return insights
+
+
+def spending_by_period(df: 'pd.DataFrame', period: str) -> 'pd.Series':
+    """Total ``amount`` per period key ('weekly', 'monthly' or 'yearly'), oldest first"""
+    from budgets import format_period_code, period_codes
+    import pandas as pd
+    
+    if df.empty or 'date' not in df:
+        return pd.Series(dtype=float)
+    dates = pd.to_datetime(df['date'], errors='coerce')
+    valid = dates.notna()
+    totals = df.loc[valid, 'amount'].groupby(period_codes(dates[valid], period)).sum().sort_index()
+    totals.index = [format_period_code(int(code), period) for code in totals.index]
+    return totals
+
+
+def apply_transaction_filters(df: 'pd.DataFrame', category_filter: Optional[Sequence[str]],
+                              amount_range: Tuple[float, float]) -> 'pd.DataFrame':
+    """Transactions matching the expense tracking filters"""
+    filtered_df = df
+    if category_filter:
+        filtered_df = filtered_df[filtered_df['category'].isin(category_filter)]
+    
+    return filtered_df[
+        (filtered_df['amount'] >= amount_range[0]) & 
+        (filtered_df['amount'] <= amount_range[1])
+    ]
+
+
+@timed
+def suggest_category(merchant: str, notes: str = "", categories: Sequence[str] = CATEGORIES,
+                     model=None, service=None) -> str:
+    """
+    AI-powered category suggestion: the local learned model answers when confident,
+    otherwise the zero-shot model (remote or a local variant), otherwise keywords
+    """
+    from category_model import get_category_model
+    from huggingface_service import get_hf_service
+    
+    text = f"{merchant} {notes}".strip()
+    model = model or get_category_model()
+    category, confidence = model.predict(text)
+    if model.is_confident(category, confidence):
+        registry.increment(CATEGORY_SOURCE, source='local')
+        return category
+    
+    service = service or get_hf_service()
+    if service.can_run('classification'):
+        result = service.classify_expense(text, list(categories))
+        if result['category'] in categories:
+            registry.increment(CATEGORY_SOURCE, source='remote')
+            return result['category']
+    
+    registry.increment(CATEGORY_SOURCE, source='keywords')
+    return keyword_category(merchant, notes)
+
+
+def learn_categories(transactions: List[Dict[str, Any]], model=None) -> int:
+    """Train the local category model on confirmed transactions and persist it"""
+    from category_model import get_category_model
+    
+    model = model or get_category_model()
+    learned = model.learn_many(
+        (f"{t.get('merchant', '')} {t.get('notes') or ''}".strip() for t in transactions),
+        (t.get('category') for t in transactions)
+    )
+    if learned:
+        model.save()
+    return learned
+
+
+def categorize_and_learn(transaction: Dict[str, Any], model=None, service=None) -> str:
+    """
+    Suggest a category for a new transaction, then learn the category it was given;
+    suggesting first keeps the label out of the suggestion it is compared with
+    """
+    suggestion = suggest_category(transaction['merchant'], transaction.get('notes') or '',
+                                  model=model, service=service)
+    learn_categories([transaction], model=model)
+    return suggestion
+
+
+def keyword_category(merchant: str, notes: str = "") -> str:
+    """Keyword-based categorization (fallback)"""
+    text = f"{merchant} {notes}".lower()
+    
+    if any(word in text for word in ['restaurant', 'coffee', 'food', 'pizza', 'burger', 'starbucks']):
+        return "Food & Dining"
+    elif any(word in text for word in ['gas', 'uber', 'taxi', 'bus', 'train', 'parking']):
+        return "Transportation"
+    elif any(word in text for word in ['amazon', 'target', 'walmart', 'shopping', 'store']):
+        return "Shopping"
+    elif any(word in text for word in ['netflix', 'spotify', 'movie', 'entertainment', 'game']):
+        return "Entertainment"
+    elif any(word in text for word in ['electric', 'water', 'internet', 'phone', 'utility', 'bill']):
+        return "Bills & Utilities"
+    elif any(word in text for word in ['doctor', 'hospital', 'pharmacy', 'medical', 'health']):
+        return "Healthcare"
+    else:
+        return "Other"
+
+
+def export_data_json(transactions: List[Dict[str, Any]], goals: List[Dict[str, Any]],
+                     user_profile: Dict[str, Any], budgets: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Serialize app data for download; datetimes are written as ISO-like strings"""
+    export_data = {
+        'transactions': transactions,
+        'goals': goals,
+        'user_profile': user_profile
+    }
+    if budgets is not None:
+        export_data['budgets'] = budgets
+    return json.dumps(export_data, indent=2, default=str)
+
+
+def parse_import_data(raw: bytes) -> Dict[str, Any]:
+    """Parse an uploaded export file"""
+    import_data = json.loads(raw)
+    if not isinstance(import_data, dict):
+        raise ValueError("Expected a JSON object with transactions, goals and user_profile")
+    return import_data
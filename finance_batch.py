@@ -0,0 +1,199 @@
+"""
+Finance Bot Batch Processor
+Bulk-categorizes, scores sentiment and summarizes transaction files with a process pool,
+writing columnar output for nightly runs
+
+Usage:
+    python finance_batch.py transactions.parquet -o enriched.parquet
+    python finance_batch.py export.json -o enriched.parquet --summaries summaries.parquet --user-column user_id
+    python finance_batch.py big.csv -o enriched.parquet --workers 8 --tasks categorize --offline
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from currency import DEFAULT_CURRENCY, format_money
+from finance_analytics import CATEGORIES
+from model_variants import local_models_enabled
+
+logger = logging.getLogger('finance_batch')
+
+TASKS = ('categorize', 'sentiment', 'summarize')
+
+# Per-process service, created by the pool initializer
+_service = None
+
+
+def _init_worker(offline: bool, log_level: str) -> None:
+    global _service
+    logging.basicConfig(level=log_level, format='%(asctime)s %(processName)s %(levelname)s %(message)s')
+    from huggingface_service import HuggingFaceService
+    _service = HuggingFaceService()
+    if offline:
+        # No key means every method uses a local model variant (FINANCE_BOT_LOCAL_MODELS=1) or its fallback path
+        _service.api_key = None
+
+
+def _describe(record: Dict[str, Any]) -> str:
+    text = record.get('description') or record.get('merchant') or ''
+    notes = record.get('notes')
+    if isinstance(notes, str) and notes:
+        text = f"{text} {notes}"
+    return str(text)
+
+
+def _enrich_chunk(records: List[Dict[str, Any]], tasks: List[str], categories: List[str]) -> List[Dict[str, Any]]:
+    """Worker: per-row categorization and sentiment for one chunk"""
+    results = []
+    for record in records:
+        text = _describe(record)
+        row: Dict[str, Any] = {'_row': record['_row']}
+        if 'categorize' in tasks:
+            classification = _service.classify_expense(text, categories)
+            row['predicted_category'] = classification['category']
+            row['category_confidence'] = float(classification['confidence'])
+            row['category_source'] = classification['source']
+        if 'sentiment' in tasks:
+            sentiment = _service.analyze_sentiment(text)
+            row['sentiment_label'] = sentiment['label']
+            row['sentiment_score'] = float(sentiment['score'])
+            # 'fallback' rows hold the neutral placeholder, not a model result
+            row['sentiment_source'] = sentiment['source']
+        results.append(row)
+    return results
+
+
+def _summarize_group(key: Any, lines: List[str], max_length: int) -> Dict[str, Any]:
+    """Worker: one summary over a user's (or the whole file's) transactions"""
+    return {
+        'group': key,
+        'transactions': len(lines),
+        'summary': _service.summarize_text('\n'.join(lines), max_length)
+    }
+
+
+def read_transactions(path: str) -> pd.DataFrame:
+    """Load CSV, JSON (app export or list), JSON Lines or Parquet"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        return pd.read_parquet(path)
+    if ext == '.feather':
+        return pd.read_feather(path)
+    if ext == '.csv':
+        return pd.read_csv(path)
+    if ext in ('.jsonl', '.ndjson'):
+        return pd.read_json(path, lines=True)
+    if ext == '.json':
+        import json
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('transactions', [])
+        return pd.DataFrame(data)
+    raise ValueError(f"Unsupported input format: {ext}")
+
+
+def write_columnar(df: pd.DataFrame, path: str) -> None:
+    """Write Parquet or Feather (needs pyarrow); .csv is accepted for environments without it"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet':
+        df.to_parquet(path, index=False)
+    elif ext == '.feather':
+        df.reset_index(drop=True).to_feather(path)
+    elif ext == '.csv':
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f"Unsupported output format: {ext}")
+
+
+def _summary_line(record: Dict[str, Any]) -> str:
+    category = record.get('predicted_category') or record.get('category') or 'Other'
+    currency = record.get('currency')
+    amount = format_money(float(record.get('amount', 0)), currency if isinstance(currency, str) else DEFAULT_CURRENCY)
+    return f"On {record.get('date', 'an unknown date')} spent {amount} at {_describe(record)} ({category})."
+
+
+def run(args: argparse.Namespace) -> int:
+    tasks = [t.strip() for t in args.tasks.split(',') if t.strip()]
+    unknown = set(tasks) - set(TASKS)
+    if unknown:
+        raise SystemExit(f"Unknown tasks: {', '.join(sorted(unknown))}")
+    if 'summarize' in tasks and not args.summaries:
+        raise SystemExit("--summaries is required for the summarize task")
+    # Categorization falls back to keywords, but sentiment and summaries have no offline fallback
+    model_only = sorted({'sentiment', 'summarize'} & set(tasks))
+    if args.offline and model_only and not local_models_enabled():
+        raise SystemExit(f"--offline needs FINANCE_BOT_LOCAL_MODELS=1 for: {', '.join(model_only)}")
+
+    started = time.perf_counter()
+    df = read_transactions(args.input)
+    logger.info("Loaded %d transactions from %s", len(df), args.input)
+
+    records = df.reset_index(drop=True).to_dict('records')
+    for i, record in enumerate(records):
+        record['_row'] = i
+
+    enriched = df.reset_index(drop=True)
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker,
+                             initargs=(args.offline, args.log_level)) as pool:
+        row_tasks = [t for t in tasks if t != 'summarize']
+        if row_tasks:
+            chunks = [records[i:i + args.chunk_size] for i in range(0, len(records), args.chunk_size)]
+            futures = [pool.submit(_enrich_chunk, chunk, row_tasks, CATEGORIES) for chunk in chunks]
+            rows: List[Dict[str, Any]] = []
+            for done, future in enumerate(as_completed(futures), 1):
+                rows.extend(future.result())
+                logger.info("Enriched chunk %d/%d", done, len(futures))
+            columns = pd.DataFrame(rows).sort_values('_row').drop(columns='_row').reset_index(drop=True)
+            enriched = pd.concat([enriched, columns], axis=1)
+            predicted = enriched.to_dict('records')
+        else:
+            predicted = records
+
+        if 'summarize' in tasks:
+            groups: Dict[Any, List[str]] = {}
+            for record in predicted:
+                key = record.get(args.user_column, 'all') if args.user_column else 'all'
+                groups.setdefault(key, []).append(_summary_line(record))
+            futures = [pool.submit(_summarize_group, key, lines, args.summary_length)
+                       for key, lines in groups.items()]
+            summaries = [f.result() for f in as_completed(futures)]
+            summary_df = pd.DataFrame(summaries).rename(columns={'group': args.user_column or 'group'})
+            write_columnar(summary_df, args.summaries)
+            logger.info("Wrote %d summaries to %s", len(summary_df), args.summaries)
+
+    write_columnar(enriched, args.output)
+    logger.info("Wrote %d rows to %s in %.1fs", len(enriched), args.output, time.perf_counter() - started)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-enrich transaction files offline")
+    parser.add_argument('input', help="CSV, JSON (app export), JSONL or Parquet file")
+    parser.add_argument('-o', '--output', required=True, help="enriched transactions (.parquet, .feather or .csv)")
+    parser.add_argument('--summaries', help="per-group summaries output (.parquet, .feather or .csv)")
+    parser.add_argument('--tasks', default='categorize,sentiment', help=f"comma separated subset of {','.join(TASKS)}")
+    parser.add_argument('--user-column', help="column to group summaries by, e.g. user_id")
+    parser.add_argument('--summary-length', type=int, default=120)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--chunk-size', type=int, default=2000, help="rows per worker task")
+    parser.add_argument('--offline', action='store_true', help="never call the Hugging Face API; sentiment and summarize then need "
+                                                               "FINANCE_BOT_LOCAL_MODELS=1")
+    parser.add_argument('--log-level', default='INFO')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=args.log_level, format='%(asctime)s %(levelname)s %(message)s')
+    from dotenv import load_dotenv
+    load_dotenv()
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,18 +1,56 @@
 """
 Hugging Face Service for Streamlit Finance Bot
 Provides AI-powered financial analysis and advice
+
+Headless: problems are sent to a pluggable reporter (logging by default), so the
+service runs in worker processes, batch jobs and tests without a Streamlit runtime.
 """
 
+import logging
 import os
-import requests
+import threading
 import time
 from typing import List, Dict, Any, Optional
-import streamlit as st
+from lazy_imports import lazy_import
+from model_variants import MODEL_INFERENCE_SECONDS, LocalRunner, ModelSelector
+from perf_metrics import HF_REQUEST_SECONDS, record_fallback, registry
+from summarization import MapReduceSummarizer
+
+requests = lazy_import('requests')
+
+logger = logging.getLogger(__name__)
+
+class LoggingReporter:
+    """Default reporter: sends service warnings and errors to a logger"""
+    
+    def __init__(self, log: Optional[logging.Logger] = None):
+        self.log = log or logger
+    
+    def warning(self, message: str) -> None:
+        self.log.warning(message)
+    
+    def error(self, message: str) -> None:
+        self.log.error(message)
+
+_default_reporter = LoggingReporter()
+
+def configure_reporting(reporter) -> None:
+    """Set the reporter used by services created without one (any object with warning/error)"""
+    global _default_reporter
+    _default_reporter = reporter
 
 class HuggingFaceService:
-    def __init__(self):
+    def __init__(self, reporter=None, model_selector: Optional[ModelSelector] = None,
+                 local_runner: Optional[LocalRunner] = None):
+        self._reporter = reporter
         self.api_key = os.getenv('HUGGINGFACE_API_KEY')
-        self.base_url = 'https://api-inference.huggingface.co/models'
+        self.base_url = os.getenv('HUGGINGFACE_API_URL', 'https://api-inference.huggingface.co/models')
+        
+        # Seconds to wait before retrying a loading model (503) or a network error
+        self.loading_retry_delay = 20
+        self.error_retry_delay = 5
+        # Retry waits in the current thread's request, kept out of variant latency samples
+        self._backoff = threading.local()
         
         # Financial-focused models
         self.models = {
@@ -22,10 +60,63 @@ class HuggingFaceService:
             'classification': 'facebook/bart-large-mnli',
             'summarization': 'facebook/bart-large-cnn'
         }
+        
+        # Each task runs on the largest variant (remote, ONNX or int8 on CPU) that fits its latency budget
+        self.model_selector = model_selector or ModelSelector()
+        self.local_runner = local_runner or LocalRunner()
+        
+        # Long documents are chunked, summarized in parallel batches and reduced
+        self.summarizer = MapReduceSummarizer(
+            self._summarize_batch,
+            model=self.models['summarization'],
+            on_fallback=lambda: record_fallback('summarization')
+        )
+    
+    @property
+    def reporter(self):
+        return self._reporter or _default_reporter
+    
+    def has_api_key(self) -> bool:
+        return bool(self.api_key) and self.api_key != 'your-huggingface-api-key-here'
+    
+    def can_run(self, task: str) -> bool:
+        """Whether any model variant (remote or local) is available for ``task``"""
+        return self.model_selector.select(task, self.has_api_key(), probe=False) is not None
+    
+    def _run_task(self, task: str, payload: Dict[str, Any]) -> Optional[Any]:
+        """Run ``payload`` on the variant selected for ``task`` and record its latency"""
+        variant = self.model_selector.select(task, self.has_api_key())
+        if variant is None:
+            return None
+        
+        if variant.is_local:
+            try:
+                # Loading (with any first-use export or quantization) is not inference latency
+                self.local_runner.get(variant)
+                start = time.perf_counter()
+                response = self.local_runner.run(variant, payload)
+            except Exception as e:
+                self.reporter.warning(f"Local model {variant.key} failed, using the API: {str(e)}")
+                self.model_selector.mark_failed(variant)
+                return self._make_request(self.models[task], payload)
+        else:
+            self._backoff.seconds = 0.0
+            start = time.perf_counter()
+            response = self._make_request(self.models[task], payload)
+        
+        if response is not None:
+            elapsed = time.perf_counter() - start - (0.0 if variant.is_local else self._backoff.seconds)
+            self.model_selector.record(variant, elapsed * 1000)
+            registry.observe(MODEL_INFERENCE_SECONDS, elapsed, task=task, variant=variant.name)
+        return response
+    
+    def _retry_sleep(self, seconds: float) -> None:
+        time.sleep(seconds)
+        self._backoff.seconds = getattr(self._backoff, 'seconds', 0.0) + seconds
     
     def _make_request(self, model: str, payload: Dict[str, Any], retries: int = 3) -> Optional[Dict]:
         """Make API request with error handling and retries"""
-        if not self.api_key or self.api_key == 'your-huggingface-api-key-here':
+        if not self.has_api_key():
             return None
         
         headers = {
@@ -36,26 +127,31 @@ class HuggingFaceService:
         url = f"{self.base_url}/{model}"
         
         for attempt in range(retries):
+            start = time.perf_counter()
             try:
                 response = requests.post(url, headers=headers, json=payload, timeout=30)
+                registry.observe(HF_REQUEST_SECONDS, time.perf_counter() - start,
+                                 model=model, status=str(response.status_code))
                 
                 if response.status_code == 503:
                     # Model is loading, wait and retry
                     if attempt < retries - 1:
-                        time.sleep(20)
+                        self._retry_sleep(self.loading_retry_delay)
                         continue
                 
                 if response.status_code == 200:
                     return response.json()
                 else:
-                    st.warning(f"API request failed with status {response.status_code}")
+                    self.reporter.warning(f"API request failed with status {response.status_code}")
                     return None
                     
             except requests.exceptions.RequestException as e:
+                registry.observe(HF_REQUEST_SECONDS, time.perf_counter() - start,
+                                 model=model, status='error')
                 if attempt < retries - 1:
-                    time.sleep(5)
+                    self._retry_sleep(self.error_retry_delay)
                     continue
-                st.error(f"Request failed: {str(e)}")
+                self.reporter.error(f"Request failed: {str(e)}")
                 return None
         
         return None
@@ -75,7 +171,7 @@ class HuggingFaceService:
                 }
             }
             
-            response = self._make_request(self.models['text_generation'], payload)
+            response = self._run_task('text_generation', payload)
             
             if response and isinstance(response, list) and len(response) > 0:
                 generated_text = response[0].get('generated_text', '')
@@ -84,32 +180,39 @@ class HuggingFaceService:
                     return advice
             
             # Fallback to static response
+            record_fallback('advice')
             return self._get_static_advice(query)
             
         except Exception as e:
-            st.error(f"Error generating advice: {str(e)}")
+            self.reporter.error(f"Error generating advice: {str(e)}")
+            record_fallback('advice')
             return self._get_static_advice(query)
     
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
-        """Analyze sentiment of financial text"""
+        """Analyze sentiment of financial text; ``source`` is 'model' or 'fallback'"""
         try:
             payload = {"inputs": text}
-            response = self._make_request(self.models['sentiment'], payload)
+            response = self._run_task('sentiment', payload)
             
             if response and isinstance(response, list) and len(response) > 0:
-                result = response[0]
+                # The API returns every label per input ([[{label, score}, ...]]); local pipelines the top one
+                scores = response[0] if isinstance(response[0], list) else response
+                result = max(scores, key=lambda item: item.get('score', 0))
                 return {
                     'label': result.get('label', 'neutral'),
                     'score': result.get('score', 0.5),
                     'confidence': 'high' if result.get('score', 0) > 0.8 else 
-                                'medium' if result.get('score', 0) > 0.5 else 'low'
+                                'medium' if result.get('score', 0) > 0.5 else 'low',
+                    'source': 'model'
                 }
             
-            return {'label': 'neutral', 'score': 0.5, 'confidence': 'low'}
+            record_fallback('sentiment')
+            return {'label': 'neutral', 'score': 0.5, 'confidence': 'low', 'source': 'fallback'}
             
         except Exception as e:
-            st.error(f"Error analyzing sentiment: {str(e)}")
-            return {'label': 'neutral', 'score': 0.5, 'confidence': 'low'}
+            self.reporter.error(f"Error analyzing sentiment: {str(e)}")
+            record_fallback('sentiment')
+            return {'label': 'neutral', 'score': 0.5, 'confidence': 'low', 'source': 'fallback'}
     
     def classify_expense(self, description: str, categories: List[str]) -> Dict[str, Any]:
         """Classify expense into categories"""
@@ -121,7 +224,7 @@ class HuggingFaceService:
                 }
             }
             
-            response = self._make_request(self.models['classification'], payload)
+            response = self._run_task('classification', payload)
             
             if response and 'labels' in response and 'scores' in response:
                 return {
@@ -130,37 +233,50 @@ class HuggingFaceService:
                     'all_categories': [
                         {'category': label, 'confidence': score}
                         for label, score in zip(response['labels'], response['scores'])
-                    ]
+                    ],
+                    'source': 'model'
                 }
             
             # Fallback to keyword-based classification
+            record_fallback('classification')
             return self._classify_expense_fallback(description, categories)
             
         except Exception as e:
-            st.error(f"Error classifying expense: {str(e)}")
+            self.reporter.error(f"Error classifying expense: {str(e)}")
+            record_fallback('classification')
             return self._classify_expense_fallback(description, categories)
     
+    def _summarize_batch(self, texts: List[str], max_length: int, min_length: int) -> List[Optional[str]]:
+        """Summarize several texts in one request; None for any text without a summary"""
+        payload = {
+            "inputs": texts if len(texts) > 1 else texts[0],
+            "parameters": {
+                "max_length": max_length,
+                "min_length": min_length,
+                "do_sample": False
+            }
+        }
+        
+        response = self._run_task('summarization', payload)
+        
+        if isinstance(response, list) and len(response) == len(texts):
+            return [r.get('summary_text') if isinstance(r, dict) else None for r in response]
+        return [None] * len(texts)
+    
     def summarize_text(self, text: str, max_length: int = 100) -> str:
-        """Summarize financial text"""
+        """Summarize financial text of any length"""
         try:
-            payload = {
-                "inputs": text,
-                "parameters": {
-                    "max_length": max_length,
-                    "min_length": 30,
-                    "do_sample": False
-                }
-            }
-            
-            response = self._make_request(self.models['summarization'], payload)
-            
-            if response and isinstance(response, list) and len(response) > 0:
-                return response[0].get('summary_text', 'Unable to summarize text.')
+            if self.can_run('summarization'):
+                summary = self.summarizer.summarize(text, max_length)
+                if summary:
+                    return summary
             
+            record_fallback('summarization')
             return 'Unable to summarize text.'
             
         except Exception as e:
-            st.error(f"Error summarizing text: {str(e)}")
+            self.reporter.error(f"Error summarizing text: {str(e)}")
+            record_fallback('summarization')
             return 'Error occurred while summarizing.'
     
     def get_financial_insights(self, transactions: List[Dict[str, Any]]) -> List[str]:
@@ -201,7 +317,7 @@ class HuggingFaceService:
             return insights if insights else ["Your spending patterns look normal."]
             
         except Exception as e:
-            st.error(f"Error generating insights: {str(e)}")
+            self.reporter.error(f"Error generating insights: {str(e)}")
             return ["Unable to generate insights at this time."]
     
     def _get_static_advice(self, query: str) -> str:
@@ -256,29 +372,46 @@ class HuggingFaceService:
         return {
             'category': best_category,
             'confidence': best_confidence,
-            'all_categories': [{'category': best_category, 'confidence': best_confidence}]
+            'all_categories': [{'category': best_category, 'confidence': best_confidence}],
+            'source': 'keywords'
         }
 
-# Global service instance
-hf_service = HuggingFaceService()
+# Global service instance, created on first use
+_hf_service: Optional[HuggingFaceService] = None
+_hf_service_lock = threading.Lock()
+
+def get_hf_service() -> HuggingFaceService:
+    """Shared service instance"""
+    global _hf_service
+    if _hf_service is None:
+        with _hf_service_lock:
+            if _hf_service is None:
+                _hf_service = HuggingFaceService()
+    return _hf_service
+
+def __getattr__(name: str) -> Any:
+    # Keep `from huggingface_service import hf_service` working without eager construction
+    if name == 'hf_service':
+        return get_hf_service()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Convenience functions for Streamlit app
 def get_financial_advice(query: str, context: str = "") -> str:
     """Get financial advice from AI or fallback"""
-    return hf_service.generate_financial_advice(query, context)
+    return get_hf_service().generate_financial_advice(query, context)
 
 def analyze_expense_sentiment(text: str) -> Dict[str, Any]:
     """Analyze sentiment of expense description"""
-    return hf_service.analyze_sentiment(text)
+    return get_hf_service().analyze_sentiment(text)
 
 def categorize_expense(description: str, categories: List[str]) -> Dict[str, Any]:
     """Categorize expense using AI"""
-    return hf_service.classify_expense(description, categories)
+    return get_hf_service().classify_expense(description, categories)
 
 def get_spending_insights(transactions: List[Dict[str, Any]]) -> List[str]:
     """Get AI insights from spending data"""
-    return hf_service.get_financial_insights(transactions)
+    return get_hf_service().get_financial_insights(transactions)
 
 def summarize_financial_text(text: str, max_length: int = 100) -> str:
     """Summarize financial text"""
-    return hf_service.summarize_text(text, max_length)
+    return get_hf_service().summarize_text(text, max_length)
@@ -0,0 +1,320 @@
+"""
+Chat Intent Router for Finance Bot
+Parses data questions ("how much did I spend on food last month?") into structured
+queries answered exactly from the user's transactions; open-ended questions still go
+to the generative advice model
+"""
+
+import calendar
+import re
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+from currency import DEFAULT_CURRENCY, format_money
+from finance_analytics import CATEGORIES
+from lazy_imports import lazy_import
+from perf_metrics import record_cache, registry, timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+else:
+    pd = lazy_import('pandas')
+
+CHAT_ROUTES = 'finance_bot_chat_routes_total'
+registry.describe(CHAT_ROUTES, 'Chat questions by route (data answer or generative advice)')
+
+# Words that make a question a request for advice (or a hypothetical) even when it mentions spending
+_ADVICE_RE = re.compile(r"\b(should|could|would|will|if|worth|can i|how can|how do i|how to|advice|advise|"
+                        r"tips?|recommend\w*|ideas?|help me|ways? to|reduce|save more|cut|improve|invest\w*)\b")
+# A data question asks about recorded spending...
+_SPENT_RE = re.compile(r"\b(spent|spend|spending|paid|costs?|bought|transactions?|expenses?|purchases?|charges?)\b")
+# ...of the user's own, or in a period of their transactions (a category alone is not enough:
+# "what does a family spend on groceries?")
+_OWN_RE = re.compile(r"\b(i|i've|me|my|mine|we|our)\b")
+
+CATEGORY_SYNONYMS: Dict[str, Sequence[str]] = {
+    'Food & Dining': ('food', 'dining', 'restaurants?', 'eating out', 'groceries', 'grocery', 'coffee',
+                      'lunch', 'dinner', 'takeout'),
+    'Transportation': ('transport', 'transportation', 'gas', 'fuel', 'uber', 'taxis?', 'commut\\w*',
+                       'parking', 'transit'),
+    'Shopping': ('shopping', 'clothes', 'clothing', 'amazon'),
+    'Entertainment': ('entertainment', 'movies?', 'streaming', 'games?', 'concerts?', 'netflix'),
+    'Bills & Utilities': ('bills?', 'utilities', 'utility', 'electric\\w*', 'internet', 'phone', 'water'),
+    'Healthcare': ('health', 'healthcare', 'medical', 'doctors?', 'pharmacy', 'medicine'),
+    'Travel': ('travel', 'trips?', 'flights?', 'hotels?', 'vacations?'),
+    'Education': ('education', 'school', 'tuition', 'courses?', 'books?'),
+}
+
+_MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+_MONTH_RE = re.compile(r"\b(" + '|'.join(sorted(_MONTHS, key=len, reverse=True)) + r")\b(?:\s+((?:19|20)\d{2}))?")
+_RELATIVE_RE = re.compile(r"\b(?:last|past|previous)\s+(\d+)\s+(day|week|month)s?\b")
+_YEAR_RE = re.compile(r"\b((?:19|20)\d{2})\b")
+
+# What was spent "on"/"at"/"for": the words after one of these up to a period phrase or punctuation
+_TARGET_PREPOSITIONS = ('on', 'at', 'for')
+_TARGET_STOP = {'last', 'this', 'past', 'previous', 'in', 'during', 'since', 'so', 'today', 'yesterday',
+                'over', 'between', 'from', 'and', 'or', 'per', 'each', 'every', 'on', 'at', 'for',
+                '?', ',', '!', ';', '.'}
+_TARGET_DETERMINERS = {'my', 'our', 'the', 'a', 'an', 'all', 'me', 'us'}
+# Targets made only of these words don't name anything ("for the whole year", "on it")
+_TARGET_FILLER = {'it', 'that', 'this', 'everything', 'anything', 'stuff', 'things', 'whole', 'entire',
+                  'year', 'month', 'week', 'day', 'time', 'average', 'total', 'most', 'least', 'me', 'us',
+                  'myself', 'ourselves', 'now', 'far'} | set(_MONTHS)
+
+
+class DataQuery:
+    def __init__(self, aggregate: str, category: Optional[str], start: Optional[date],
+                 end: Optional[date], period_label: str, merchant: Optional[str] = None):
+        self.aggregate = aggregate
+        self.category = category
+        # Spending target that is not a category ("rent", "starbucks"), matched against merchant and notes
+        self.merchant = merchant
+        # Half-open [start, end); None means unbounded
+        self.start = start
+        self.end = end
+        self.period_label = period_label
+
+    def __repr__(self) -> str:
+        target = f", {self.merchant!r}" if self.merchant else ''
+        return f"DataQuery({self.aggregate}, {self.category}{target}, {self.start}..{self.end})"
+
+
+def _add_months(d: date, months: int) -> date:
+    month = d.month - 1 + months
+    year = d.year + month // 12
+    month = month % 12 + 1
+    return date(year, month, min(d.day, calendar.monthrange(year, month)[1]))
+
+
+def parse_period(text: str, today: date) -> Tuple[Optional[date], Optional[date], str]:
+    """(start, end, label) for the time range a question mentions; all time if none"""
+    tomorrow = today + timedelta(days=1)
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    year_start = today.replace(month=1, day=1)
+
+    fixed = [
+        ('today', today, tomorrow),
+        ('yesterday', today - timedelta(days=1), today),
+        ('this week', week_start, tomorrow),
+        ('last week', week_start - timedelta(days=7), week_start),
+        ('this month', month_start, tomorrow),
+        ('last month', _add_months(month_start, -1), month_start),
+        ('this year', year_start, tomorrow),
+        ('last year', year_start.replace(year=today.year - 1), year_start),
+    ]
+    for phrase, start, end in fixed:
+        if re.search(rf"\b{phrase}\b", text):
+            return start, end, phrase
+
+    match = _RELATIVE_RE.search(text)
+    if match:
+        n, unit = int(match.group(1)), match.group(2)
+        if unit == 'month':
+            start = _add_months(tomorrow, -n)
+        else:
+            start = tomorrow - timedelta(days=n * (7 if unit == 'week' else 1))
+        return start, tomorrow, f"in the last {n} {unit}{'s' if n != 1 else ''}"
+
+    match = _MONTH_RE.search(text)
+    if match and not (match.group(1) == 'may' and not match.group(2) and re.search(r"\bmay i\b", text)):
+        month = _MONTHS[match.group(1)]
+        if match.group(2):
+            year = int(match.group(2))
+        else:
+            # The most recent such month, this year or last
+            year = today.year if month <= today.month else today.year - 1
+        start = date(year, month, 1)
+        return start, _add_months(start, 1), f"in {calendar.month_name[month]} {year}"
+
+    match = _YEAR_RE.search(text)
+    if match:
+        year = int(match.group(1))
+        return date(year, 1, 1), date(year + 1, 1, 1), f"in {year}"
+
+    return None, None, ''
+
+
+def parse_category(text: str, categories: Sequence[str] = CATEGORIES) -> Optional[str]:
+    for category in categories:
+        patterns = [re.escape(category.lower())] + list(CATEGORY_SYNONYMS.get(category, ()))
+        if re.search(r"\b(" + '|'.join(patterns) + r")\b", text):
+            return category
+    return None
+
+
+def parse_targets(text: str) -> List[str]:
+    """What a question says was spent on, at or for ("on food", "at starbucks", "on my car")"""
+    tokens = re.findall(r"[a-z0-9&'-]+(?:\.[a-z0-9]+)*|[?,!;.]", text)
+    targets = []
+    for i, token in enumerate(tokens):
+        if token not in _TARGET_PREPOSITIONS:
+            continue
+        words = []
+        for word in tokens[i + 1:]:
+            if word in _TARGET_STOP:
+                break
+            words.append(word)
+        while words and words[0] in _TARGET_DETERMINERS:
+            words.pop(0)
+        if words and not all(w in _TARGET_FILLER or w.isdigit() for w in words):
+            targets.append(' '.join(words))
+    return targets
+
+
+def parse_aggregate(text: str) -> Optional[str]:
+    if re.search(r"\b(how many|number of|count)\b", text):
+        return 'count'
+    if re.search(r"\b(average|avg|mean|typical)\b", text):
+        return 'average'
+    if re.search(r"\b(which|what)\s+category\b|\bwhere\b.*\bmost\b|\bspend\w*\s+(the\s+)?most\s+on\b", text):
+        return 'top_category'
+    if re.search(r"\b(biggest|largest|most expensive|highest)\b", text):
+        return 'max'
+    if re.search(r"\b(smallest|cheapest|lowest)\b", text):
+        return 'min'
+    if re.search(r"\b(how much|total|spent|spend|spending|paid|cost)\b", text):
+        return 'sum'
+    return None
+
+
+def parse_query(question: str, categories: Sequence[str] = CATEGORIES,
+                today: Optional[date] = None) -> Optional[DataQuery]:
+    """
+    Structured query for a question about the user's own spending, or None for anything
+    to send to the advice model ("what is the average credit score?" is not about
+    the user's transactions even though it asks for an average)
+    """
+    text = ' '.join(question.lower().split())
+    if _ADVICE_RE.search(text) or not _SPENT_RE.search(text):
+        return None
+    start, end, label = parse_period(text, today or date.today())
+    if not (_OWN_RE.search(text) or label):
+        return None
+
+    # A target that names no category is kept as a merchant/notes match rather than dropped,
+    # which would answer "how much did I spend on rent?" with all spending
+    category, merchant, rest = None, None, text
+    for target in parse_targets(text):
+        rest = rest.replace(target, ' ')
+        category = category or parse_category(target, categories)
+        if merchant is None and not parse_category(target, categories):
+            merchant = target
+    category = category or parse_category(rest, categories)
+    # "show my food expenses" and the like are answered with the total
+    return DataQuery(parse_aggregate(text) or 'sum', category, start, end, label, merchant)
+
+
+class IntentRouter:
+    """Caches routing decisions per normalized question (and day, for relative periods)"""
+
+    def __init__(self, categories: Sequence[str] = CATEGORIES, maxsize: int = 1024):
+        self.categories = list(categories)
+        self.maxsize = maxsize
+        self._cache: 'OrderedDict[Tuple[str, date], Optional[DataQuery]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def route(self, question: str, today: Optional[date] = None) -> Optional[DataQuery]:
+        today = today or date.today()
+        key = (' '.join(re.findall(r"[a-z0-9&]+", question.lower())), today)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                record_cache('intent_router', True)
+                query = self._cache[key]
+                registry.increment(CHAT_ROUTES, route='data' if query else 'advice')
+                return query
+        record_cache('intent_router', False)
+        query = parse_query(question, self.categories, today)
+        with self._lock:
+            self._cache[key] = query
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        registry.increment(CHAT_ROUTES, route='data' if query else 'advice')
+        return query
+
+
+def prepare_frame(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Transactions with parsed dates, built once per data change and reused by every answer"""
+    out = df.copy()
+    if out.empty:
+        return out.assign(_date=pd.Series(dtype='datetime64[ns]'))
+    out['_date'] = pd.to_datetime(out['date'], errors='coerce').dt.normalize()
+    text = out['merchant'].fillna('').astype(str) if 'merchant' in out else pd.Series('', index=out.index)
+    if 'notes' in out:
+        text = text + ' ' + out['notes'].fillna('').astype(str)
+    out['_text'] = text.str.lower()
+    return out
+
+
+@timed
+def answer_query(query: DataQuery, frame: 'pd.DataFrame', currency: str = DEFAULT_CURRENCY) -> str:
+    """Exact answer from a ``prepare_frame`` frame whose amounts are in ``currency``"""
+    if frame.empty:
+        return "You don't have any transactions yet. Add some under Expense Tracking and ask again!"
+
+    mask = pd.Series(True, index=frame.index)
+    if query.start:
+        mask &= frame['_date'] >= pd.Timestamp(query.start)
+    if query.end:
+        mask &= frame['_date'] < pd.Timestamp(query.end)
+    if query.merchant:
+        mask &= frame['_text'].str.contains(rf"\b{re.escape(query.merchant)}", regex=True)
+    period = query.period_label or 'overall'
+    match = f' matching "{query.merchant}"' if query.merchant else ''
+    if query.aggregate == 'top_category':
+        return _answer_top_category(frame[mask], currency, f"{match.strip()} {period}".strip())
+
+    if query.category:
+        mask &= frame['category'] == query.category
+    rows = frame[mask]
+    what = f"{query.category} " if query.category else ''
+    if rows.empty:
+        return f"You have no {what}transactions{match} {period}."
+
+    def money(value) -> str:
+        return format_money(float(value), currency)
+
+    total, count = rows['amount'].sum(), len(rows)
+    on = f" on {query.category}" if query.category else ''
+    if query.merchant:
+        on = f" on {what}transactions{match}"
+    if query.aggregate == 'count':
+        return f"You had {count} {what}transaction{'s' if count != 1 else ''}{match} {period}, " \
+               f"totalling {money(total)}."
+    if query.aggregate == 'average':
+        return f"Your average {what}transaction{match} {period} was {money(total / count)} " \
+               f"across {count} transactions."
+    if query.aggregate in ('max', 'min'):
+        row = rows.loc[rows['amount'].idxmax() if query.aggregate == 'max' else rows['amount'].idxmin()]
+        size = 'largest' if query.aggregate == 'max' else 'smallest'
+        return f"Your {size} {what}expense{match} {period} was {money(row['amount'])} at {row.get('merchant', 'unknown')} " \
+               f"on {row['date']}."
+    return f"You spent {money(total)}{on} {period} ({count} transaction{'s' if count != 1 else ''})."
+
+
+def _answer_top_category(rows: 'pd.DataFrame', currency: str, period: str) -> str:
+    if rows.empty:
+        return f"You have no transactions {period}."
+    totals = rows.groupby('category')['amount'].sum().sort_values(ascending=False)
+    top, amount, total = totals.index[0], totals.iloc[0], totals.sum()
+    share = amount / total if total else 0
+    return f"You spent the most on {top} {period}: {format_money(amount, currency)} " \
+           f"({share:.0%} of {format_money(total, currency)})."
+
+
+_router: Optional[IntentRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_intent_router() -> IntentRouter:
+    """Process-wide router; routing decisions are shared across sessions"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = IntentRouter()
+    return _router
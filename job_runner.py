@@ -0,0 +1,197 @@
+"""
+Background Job Runner for Streamlit Finance Bot
+Runs slow AI, import and analytics work off the Streamlit script thread
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+IO_WORKERS = int(os.getenv('FINANCE_BOT_IO_WORKERS', '8'))
+CPU_WORKERS = int(os.getenv('FINANCE_BOT_CPU_WORKERS', str(max(1, (os.cpu_count() or 2) - 1))))
+MAX_FINISHED_JOBS = 256
+
+
+class JobContext:
+    """Handle passed to context-aware thread jobs for progress and cancellation"""
+
+    def __init__(self, job: 'Job'):
+        self._job = job
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_event.is_set()
+
+    def progress(self, fraction: float, message: str = "") -> None:
+        """Report progress between 0 and 1; long loops should also check ``cancelled``"""
+        self._job.progress = max(0.0, min(1.0, fraction))
+        if message:
+            self._job.message = message
+
+
+class Job:
+    def __init__(self, job_id: str, kind: str, name: str):
+        self.id = job_id
+        self.kind = kind
+        self.name = name
+        self.future: Optional[Future] = None
+        self.cancel_event = threading.Event()
+        self.submitted_at = time.time()
+        self.progress = 0.0
+        self.message = ""
+
+    @property
+    def status(self) -> str:
+        future = self.future
+        if future is None:
+            return 'pending'
+        if future.cancelled() or (self.cancel_event.is_set() and future.done()):
+            return 'cancelled'
+        if future.done():
+            return 'failed' if future.exception() is not None else 'done'
+        if self.cancel_event.is_set():
+            return 'cancelling'
+        return 'running' if future.running() else 'pending'
+
+    def to_dict(self) -> Dict[str, Any]:
+        status = self.status
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'name': self.name,
+            'status': status,
+            'progress': 1.0 if status == 'done' else self.progress,
+            'message': self.message,
+            'elapsed': time.time() - self.submitted_at,
+            'error': str(self.future.exception()) if status == 'failed' else None
+        }
+
+
+class JobRunner:
+    """
+    Process-wide job runner: a thread pool for I/O-bound work such as Hugging Face
+    API calls, and a process pool for CPU-bound analytics and local inference.
+    Jobs are addressed by id so a Streamlit session can poll and collect them
+    across reruns. Process jobs must be module-level functions with picklable
+    arguments. The app itself currently submits only thread jobs; the process
+    pool is created on the first ``submit_cpu`` call.
+    """
+
+    def __init__(self, io_workers: int = IO_WORKERS, cpu_workers: int = CPU_WORKERS):
+        self.io_workers = io_workers
+        self.cpu_workers = cpu_workers
+        self._io_pool: Optional[ThreadPoolExecutor] = None
+        self._cpu_pool: Optional['ProcessPoolExecutor'] = None
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _get_io_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._io_pool is None:
+                self._io_pool = ThreadPoolExecutor(max_workers=self.io_workers,
+                                                   thread_name_prefix='finance-bot-io')
+            return self._io_pool
+
+    def _get_cpu_pool(self) -> 'ProcessPoolExecutor':
+        with self._lock:
+            if self._cpu_pool is None:
+                # Imported here: multiprocessing is only needed once CPU work is submitted
+                import multiprocessing
+                from concurrent.futures import ProcessPoolExecutor
+
+                # Spawn rather than fork: the Streamlit server is multithreaded
+                self._cpu_pool = ProcessPoolExecutor(max_workers=self.cpu_workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._cpu_pool
+
+    def _register(self, kind: str, name: str) -> Job:
+        job = Job(uuid.uuid4().hex[:12], kind, name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        return job
+
+    def _evict_finished(self) -> None:
+        finished = [j for j in self._jobs.values() if j.future is not None and j.future.done()]
+        excess = len(finished) - MAX_FINISHED_JOBS
+        if excess > 0:
+            for job in sorted(finished, key=lambda j: j.submitted_at)[:excess]:
+                del self._jobs[job.id]
+
+    def submit_io(self, func: Callable, *args, name: Optional[str] = None,
+                  with_context: bool = False, **kwargs) -> str:
+        """Run ``func`` on the thread pool; with_context passes a JobContext as first argument"""
+        job = self._register('io', name or getattr(func, '__name__', 'job'))
+
+        def run():
+            if job.cancel_event.is_set():
+                raise CancelledError()
+            if with_context:
+                return func(JobContext(job), *args, **kwargs)
+            return func(*args, **kwargs)
+
+        job.future = self._get_io_pool().submit(run)
+        return job.id
+
+    def submit_cpu(self, func: Callable, *args, name: Optional[str] = None, **kwargs) -> str:
+        """Run ``func`` on the process pool"""
+        job = self._register('cpu', name or getattr(func, '__name__', 'job'))
+        job.future = self._get_cpu_pool().submit(func, *args, **kwargs)
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Snapshot of a job's status and progress, or None if unknown"""
+        job = self.get(job_id)
+        return job.to_dict() if job else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job, or ask a running context-aware job to stop"""
+        job = self.get(job_id)
+        if job is None or job.future is None or job.future.done():
+            return False
+        job.cancel_event.set()
+        job.future.cancel()
+        return True
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Any:
+        """Block for a job's result; raises its exception if it failed"""
+        job = self.get(job_id)
+        if job is None or job.future is None:
+            raise KeyError(f"Unknown job: {job_id}")
+        return job.future.result(timeout=timeout)
+
+    def forget(self, job_id: str) -> None:
+        """Drop a job once its result has been handed off"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            for pool in (self._io_pool, self._cpu_pool):
+                if pool is not None:
+                    pool.shutdown(wait=wait, cancel_futures=True)
+            self._io_pool = None
+            self._cpu_pool = None
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Process-wide runner shared by all sessions"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,89 @@
+"""
+Lazy Imports for Streamlit Finance Bot
+Defers heavy modules (pandas, plotly, requests, model runtimes) until first use and
+records how long each first import took
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+from typing import Iterable
+
+from perf_metrics import registry
+
+IMPORT_SECONDS = 'finance_bot_import_seconds'
+registry.describe(IMPORT_SECONDS, 'Time spent on the first import of lazily loaded modules')
+
+# Modules warmed in the background after first paint when FINANCE_BOT_PRELOAD is set
+DEFAULT_PRELOAD = ('pandas', 'plotly.express', 'requests')
+
+_import_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that performs the real import on first attribute access"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_target'] = None
+
+    def _load(self) -> types.ModuleType:
+        target = self.__dict__['_lazy_target']
+        if target is None:
+            target = import_timed(self.__name__)
+            self.__dict__['_lazy_target'] = target
+        return target
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_target'] is not None else 'deferred'
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def import_timed(name: str) -> types.ModuleType:
+    """Import ``name``, recording the time taken if it was not already loaded"""
+    with _import_lock:
+        loaded = name in sys.modules
+        start = time.perf_counter()
+        # import_module also waits for a module another thread is still initializing
+        module = importlib.import_module(name)
+        if not loaded:
+            registry.observe(IMPORT_SECONDS, time.perf_counter() - start, module=name)
+    return module
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Stand-in for ``name`` that imports it on first attribute access"""
+    return LazyModule(name)
+
+
+_preload_started = False
+
+
+def preload_in_background(names: Iterable[str] = DEFAULT_PRELOAD) -> bool:
+    """
+    Warm heavy modules on a daemon thread (once per process) when FINANCE_BOT_PRELOAD=1,
+    so the first page that needs them does not pay the import cost.
+    """
+    global _preload_started
+    if _preload_started or os.getenv('FINANCE_BOT_PRELOAD', '0') != '1':
+        return False
+    _preload_started = True
+
+    def run():
+        for name in names:
+            try:
+                import_timed(name)
+            except ImportError:
+                pass
+
+    threading.Thread(target=run, name='finance-bot-preload', daemon=True).start()
+    return True
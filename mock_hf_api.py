@@ -0,0 +1,184 @@
+"""
+Local Hugging Face Inference API Stand-in
+Serves canned model responses with configurable latency, 503 "loading" and 429 rate limits
+
+Run standalone and point the app at it:
+    python mock_hf_api.py --port 8765 --latency-ms 150 --loading-rate 0.05
+    HUGGINGFACE_API_URL=http://127.0.0.1:8765/models streamlit run streamlit_app.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+
+
+class MockConfig:
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 loading_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 cold_start_requests: int = 0, seed: int = 42):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.loading_rate = loading_rate
+        self.rate_limit_rate = rate_limit_rate
+        # The first N requests per model answer 503 as if the model were loading
+        self.cold_start_requests = cold_start_requests
+        self.seed = seed
+
+
+def _model_response(model: str, payload: Dict[str, Any]) -> Any:
+    """Response bodies in the shapes HuggingFaceService parses"""
+    inputs = payload.get('inputs', '')
+    name = model.lower()
+
+    if 'mnli' in name or 'candidate_labels' in payload.get('parameters', {}):
+        labels = list(payload.get('parameters', {}).get('candidate_labels', []))
+        text = str(inputs).lower()
+        # Stable pseudo-scores: favour labels whose words appear in the text
+        raw = [1.0 + sum(word in text for word in label.lower().split()) for label in labels]
+        total = sum(raw) or 1.0
+        ranked = sorted(zip(labels, [r / total for r in raw]), key=lambda x: -x[1])
+        return {
+            'sequence': inputs,
+            'labels': [label for label, _ in ranked],
+            'scores': [score for _, score in ranked]
+        }
+
+    if 'finbert' in name or 'sentiment' in name:
+        # Text classification returns every label for each input
+        return [[{'label': 'neutral', 'score': 0.72}, {'label': 'positive', 'score': 0.18},
+                 {'label': 'negative', 'score': 0.10}]]
+
+    if 'cnn' in name or 'summar' in name:
+        max_length = payload.get('parameters', {}).get('max_length', 100)
+        texts = inputs if isinstance(inputs, list) else [inputs]
+        return [{'summary_text': ' '.join(str(text).split()[:max(1, max_length // 2)])} for text in texts]
+
+    if 'squad' in name:
+        return {'answer': 'index funds', 'score': 0.61, 'start': 0, 'end': 11}
+
+    return [{'generated_text': f"{inputs} Build an emergency fund first, then invest regularly in low-cost index funds."}]
+
+
+class MockHFServer:
+    """
+    Threaded local server mimicking ``POST /models/<model>``. Usable as a context
+    manager; ``url`` is the base to assign to HuggingFaceService.base_url.
+    """
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or MockConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._model_requests: Dict[str, int] = {}
+        self.stats = {'requests': 0, '200': 0, '503': 0, '429': 0}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/models"
+
+    def _decide(self, model: str) -> Tuple[int, float]:
+        """Pick the status code and delay for the next request to ``model``"""
+        config = self.config
+        with self._lock:
+            seen = self._model_requests.get(model, 0)
+            self._model_requests[model] = seen + 1
+            roll = self._rng.random()
+            delay = max(0.0, config.latency_ms + self._rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+            if seen < config.cold_start_requests or roll < config.loading_rate:
+                status = 503
+            elif roll < config.loading_rate + config.rate_limit_rate:
+                status = 429
+            else:
+                status = 200
+            self.stats['requests'] += 1
+            self.stats[str(status)] += 1
+        return status, delay
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                if not self.path.startswith('/models/'):
+                    self._send(404, {'error': 'Not found'})
+                    return
+                model = self.path[len('/models/'):]
+                length = int(self.headers.get('Content-Length', 0))
+                try:
+                    payload = json.loads(self.rfile.read(length) or b'{}')
+                except ValueError:
+                    self._send(400, {'error': 'Invalid JSON'})
+                    return
+
+                status, delay = server._decide(model)
+                time.sleep(delay)
+                if status == 503:
+                    self._send(503, {'error': f'Model {model} is currently loading', 'estimated_time': 20.0})
+                elif status == 429:
+                    self._send(429, {'error': 'Rate limit reached. Please retry later.'})
+                else:
+                    self._send(200, _model_response(model, payload))
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'MockHFServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mock-hf-api', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'MockHFServer':
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Hugging Face inference API stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=100.0)
+    parser.add_argument('--jitter-ms', type=float, default=20.0)
+    parser.add_argument('--loading-rate', type=float, default=0.0, help="fraction of requests answered 503")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="fraction of requests answered 429")
+    parser.add_argument('--cold-start-requests', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency_ms, args.jitter_ms, args.loading_rate, args.rate_limit_rate,
+                        args.cold_start_requests, args.seed)
+    server = MockHFServer(config, args.host, args.port)
+    print(f"Mock Hugging Face API listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
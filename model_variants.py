@@ -0,0 +1,362 @@
+"""
+Model Variants for Finance Bot
+Full-size, int8-quantized and ONNX-exported CPU variants of each task model, and a
+selector that picks the largest variant whose measured latency fits a per-task budget
+
+Local variants need the optional runtimes (transformers + torch, and optimum[onnxruntime]
+for ONNX) and are only considered when FINANCE_BOT_LOCAL_MODELS=1. Without them the
+selector always answers with the remote Inference API model, as before.
+"""
+
+import importlib.util
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from lazy_imports import import_timed
+from perf_metrics import registry
+
+MODEL_INFERENCE_SECONDS = 'finance_bot_model_inference_seconds'
+registry.describe(MODEL_INFERENCE_SECONDS, 'Inference latency by task and selected model variant')
+
+PIPELINE_TASKS = {
+    'text_generation': 'text-generation',
+    'sentiment': 'text-classification',
+    'question_answering': 'question-answering',
+    'classification': 'zero-shot-classification',
+    'summarization': 'summarization'
+}
+
+ORT_MODEL_CLASSES = {
+    'text_generation': 'ORTModelForCausalLM',
+    'sentiment': 'ORTModelForSequenceClassification',
+    'question_answering': 'ORTModelForQuestionAnswering',
+    'classification': 'ORTModelForSequenceClassification',
+    'summarization': 'ORTModelForSeq2SeqLM'
+}
+
+# Interactive defaults; override with FINANCE_BOT_BUDGET_<TASK>_MS
+DEFAULT_BUDGETS_MS = {
+    'text_generation': 2500,
+    'sentiment': 250,
+    'question_answering': 400,
+    'classification': 400,
+    'summarization': 4000
+}
+
+MODEL_DIR = os.getenv('FINANCE_BOT_MODEL_DIR', os.path.join('models', 'variants'))
+TIMINGS_PATH = os.getenv('FINANCE_BOT_MODEL_TIMINGS', 'model_timings.json')
+TIMING_WINDOW = 50
+# Measured samples needed before they replace the saved benchmark timing (or the variant's prior)
+MIN_TIMING_SAMPLES = 5
+# A larger variant that is over budget is retried once this often, so one slow spell doesn't exclude it for good
+REPROBE_SECONDS = 300
+# A variant that failed to load or run is skipped for this long
+FAILURE_COOLDOWN_SECONDS = 600
+
+
+class ModelVariant:
+    def __init__(self, task: str, name: str, model_id: str, backend: str, expected_ms: float):
+        self.task = task
+        self.name = name
+        self.model_id = model_id
+        # remote | torch | torch-int8 | onnx | onnx-int8
+        self.backend = backend
+        # Prior latency estimate on a 4-core CPU, used until the variant is measured
+        self.expected_ms = expected_ms
+
+    @property
+    def key(self) -> str:
+        return f"{self.task}:{self.name}"
+
+    @property
+    def is_local(self) -> bool:
+        return self.backend != 'remote'
+
+    def __repr__(self) -> str:
+        return f"ModelVariant({self.key}, {self.model_id}, {self.backend})"
+
+
+def _variants(task: str, rows: List[tuple]) -> List[ModelVariant]:
+    return [ModelVariant(task, *row) for row in rows]
+
+
+# Per task, largest / most accurate first
+VARIANTS: Dict[str, List[ModelVariant]] = {
+    'text_generation': _variants('text_generation', [
+        ('remote', 'microsoft/DialoGPT-medium', 'remote', 1500),
+        ('medium-onnx-int8', 'microsoft/DialoGPT-medium', 'onnx-int8', 1800),
+        ('medium-int8', 'microsoft/DialoGPT-medium', 'torch-int8', 2600),
+        ('small-onnx-int8', 'microsoft/DialoGPT-small', 'onnx-int8', 600),
+    ]),
+    'sentiment': _variants('sentiment', [
+        ('remote', 'ProsusAI/finbert', 'remote', 600),
+        ('onnx', 'ProsusAI/finbert', 'onnx', 120),
+        ('onnx-int8', 'ProsusAI/finbert', 'onnx-int8', 60),
+        ('int8', 'ProsusAI/finbert', 'torch-int8', 90),
+    ]),
+    'question_answering': _variants('question_answering', [
+        ('remote', 'deepset/roberta-base-squad2', 'remote', 700),
+        ('onnx-int8', 'deepset/roberta-base-squad2', 'onnx-int8', 150),
+        ('distil-onnx-int8', 'distilbert-base-cased-distilled-squad', 'onnx-int8', 70),
+    ]),
+    'classification': _variants('classification', [
+        ('remote', 'facebook/bart-large-mnli', 'remote', 900),
+        ('onnx', 'facebook/bart-large-mnli', 'onnx', 1100),
+        ('onnx-int8', 'facebook/bart-large-mnli', 'onnx-int8', 450),
+        ('int8', 'facebook/bart-large-mnli', 'torch-int8', 700),
+        ('distil-onnx-int8', 'valhalla/distilbart-mnli-12-3', 'onnx-int8', 180),
+    ]),
+    'summarization': _variants('summarization', [
+        ('remote', 'facebook/bart-large-cnn', 'remote', 3000),
+        ('onnx-int8', 'facebook/bart-large-cnn', 'onnx-int8', 4500),
+        ('distil-12-6-onnx-int8', 'sshleifer/distilbart-cnn-12-6', 'onnx-int8', 2500),
+        ('distil-6-6-onnx-int8', 'sshleifer/distilbart-cnn-6-6', 'onnx-int8', 1500),
+    ]),
+}
+
+
+def _has_module(name: str) -> bool:
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def backend_available(backend: str) -> bool:
+    if backend == 'remote':
+        return True
+    if backend in ('torch', 'torch-int8'):
+        return _has_module('transformers') and _has_module('torch')
+    if backend in ('onnx', 'onnx-int8'):
+        return _has_module('transformers') and _has_module('optimum.onnxruntime')
+    return False
+
+
+def local_models_enabled() -> bool:
+    return os.getenv('FINANCE_BOT_LOCAL_MODELS', '0') == '1'
+
+
+def budget_ms(task: str) -> float:
+    value = os.getenv(f"FINANCE_BOT_BUDGET_{task.upper()}_MS")
+    return float(value) if value else DEFAULT_BUDGETS_MS[task]
+
+
+class LatencyTracker:
+    """Rolling per-variant latency samples, seeded from timings saved by benchmark_models.py"""
+
+    def __init__(self, path: Optional[str] = TIMINGS_PATH, window: int = TIMING_WINDOW,
+                 min_samples: int = MIN_TIMING_SAMPLES):
+        self.path = path
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._priors: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self._priors = {k: float(v) for k, v in json.load(f).items()}
+
+    def record(self, key: str, ms: float) -> None:
+        with self._lock:
+            if key not in self._samples:
+                self._samples[key] = deque(maxlen=self.window)
+            self._samples[key].append(ms)
+
+    def p90(self, key: str) -> Optional[float]:
+        """Measured p90 once there are ``min_samples`` samples, else the saved timing (or None)"""
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return self._priors.get(key)
+        return samples[min(len(samples) - 1, int(0.9 * len(samples)))]
+
+    def save(self, timings: Dict[str, float], path: Optional[str] = None) -> str:
+        path = path or self.path
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(timings, f, indent=2, sort_keys=True)
+        self._priors.update(timings)
+        return path
+
+
+def _normalize_output(task: str, output: Any) -> Any:
+    """Shape local pipeline output like the Inference API responses the service parses"""
+    if task == 'summarization' and isinstance(output, list):
+        return [item[0] if isinstance(item, list) else item for item in output]
+    if task == 'text_generation' and isinstance(output, list) and output and isinstance(output[0], list):
+        return output[0]
+    return output
+
+
+class LocalRunner:
+    """Loads and caches local pipelines; ONNX exports and quantized weights are cached on disk"""
+
+    def __init__(self, model_dir: str = MODEL_DIR):
+        self.model_dir = model_dir
+        self._pipelines: Dict[str, Any] = {}
+        # One load lock per model id: a long export blocks only variants sharing its files
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _variant_dir(self, variant: ModelVariant, suffix: str) -> str:
+        return os.path.join(self.model_dir, variant.model_id.replace('/', '--'), suffix)
+
+    def _export_onnx(self, variant: ModelVariant, ort: Any, model_cls: Any) -> str:
+        transformers = import_timed('transformers')
+        export_dir = self._variant_dir(variant, 'onnx')
+        if not os.path.isdir(export_dir):
+            model = model_cls.from_pretrained(variant.model_id, export=True)
+            model.save_pretrained(export_dir)
+            transformers.AutoTokenizer.from_pretrained(variant.model_id).save_pretrained(export_dir)
+        return export_dir
+
+    def _quantize_onnx(self, variant: ModelVariant, export_dir: str) -> str:
+        """Dynamic int8 quantization of every ONNX graph (seq2seq models have several)"""
+        quant_dir = self._variant_dir(variant, 'onnx-int8')
+        if os.path.isdir(quant_dir):
+            return quant_dir
+        ort = import_timed('optimum.onnxruntime')
+        configuration = import_timed('optimum.onnxruntime.configuration')
+        qconfig = configuration.AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        for file_name in sorted(os.listdir(export_dir)):
+            if file_name.endswith('.onnx'):
+                quantizer = ort.ORTQuantizer.from_pretrained(export_dir, file_name=file_name)
+                quantizer.quantize(save_dir=quant_dir, quantization_config=qconfig)
+        transformers = import_timed('transformers')
+        transformers.AutoTokenizer.from_pretrained(export_dir).save_pretrained(quant_dir)
+        for file_name in os.listdir(export_dir):
+            if file_name.endswith('.json') and not os.path.exists(os.path.join(quant_dir, file_name)):
+                with open(os.path.join(export_dir, file_name), 'rb') as src, \
+                        open(os.path.join(quant_dir, file_name), 'wb') as dst:
+                    dst.write(src.read())
+        return quant_dir
+
+    def _load(self, variant: ModelVariant) -> Any:
+        transformers = import_timed('transformers')
+        task = PIPELINE_TASKS[variant.task]
+
+        if variant.backend in ('torch', 'torch-int8'):
+            pipe = transformers.pipeline(task, model=variant.model_id, device=-1)
+            if variant.backend == 'torch-int8':
+                torch = import_timed('torch')
+                pipe.model = torch.quantization.quantize_dynamic(pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+            return pipe
+
+        ort = import_timed('optimum.onnxruntime')
+        model_cls = getattr(ort, ORT_MODEL_CLASSES[variant.task])
+        model_dir = self._export_onnx(variant, ort, model_cls)
+        kwargs: Dict[str, Any] = {}
+        if variant.backend == 'onnx-int8':
+            model_dir = self._quantize_onnx(variant, model_dir)
+            if variant.task == 'summarization':
+                kwargs = {
+                    'encoder_file_name': 'encoder_model_quantized.onnx',
+                    'decoder_file_name': 'decoder_model_quantized.onnx',
+                    'decoder_with_past_file_name': 'decoder_with_past_model_quantized.onnx'
+                }
+                if not os.path.exists(os.path.join(model_dir, kwargs['decoder_with_past_file_name'])):
+                    kwargs.pop('decoder_with_past_file_name')
+                    kwargs['use_cache'] = False
+            else:
+                quantized = [f for f in os.listdir(model_dir) if f.endswith('_quantized.onnx')]
+                kwargs = {'file_name': sorted(quantized)[0]}
+        model = model_cls.from_pretrained(model_dir, **kwargs)
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_dir)
+        return transformers.pipeline(task, model=model, tokenizer=tokenizer, device=-1)
+
+    def get(self, variant: ModelVariant) -> Any:
+        """Pipeline for ``variant``, loading it on first use"""
+        pipe = self._pipelines.get(variant.key)
+        if pipe is not None:
+            return pipe
+        with self._lock:
+            load_lock = self._load_locks.setdefault(variant.model_id, threading.Lock())
+        with load_lock:
+            if variant.key not in self._pipelines:
+                self._pipelines[variant.key] = self._load(variant)
+            return self._pipelines[variant.key]
+
+    def run(self, variant: ModelVariant, payload: Dict[str, Any]) -> Any:
+        """Run an Inference-API-style payload through the local pipeline"""
+        pipe = self.get(variant)
+        parameters = dict(payload.get('parameters', {}))
+        inputs = payload.get('inputs')
+        if variant.task == 'question_answering':
+            return pipe(question=inputs['question'], context=inputs['context'])
+        if variant.task == 'classification':
+            return pipe(inputs, candidate_labels=parameters.pop('candidate_labels'), **parameters)
+        return _normalize_output(variant.task, pipe(inputs, **parameters))
+
+
+class ModelSelector:
+    """
+    Picks, per task, the largest available variant whose p90 latency (measured, else
+    saved from benchmarks, else the variant's prior) fits the task's budget; when none
+    fits, the fastest one. Larger variants over budget are re-probed every
+    REPROBE_SECONDS so their measurements can recover.
+    """
+
+    def __init__(self, variants: Optional[Dict[str, List[ModelVariant]]] = None,
+                 tracker: Optional[LatencyTracker] = None, enable_local: Optional[bool] = None,
+                 budgets: Optional[Dict[str, float]] = None):
+        self.variants = variants or VARIANTS
+        self.tracker = tracker or LatencyTracker()
+        self.enable_local = local_models_enabled() if enable_local is None else enable_local
+        self.budgets = budgets or {}
+        self._failed_until: Dict[str, float] = {}
+        self._backend_ok: Dict[str, bool] = {}
+        self._last_selected: Dict[str, float] = {}
+        self._started = time.time()
+        self._lock = threading.Lock()
+
+    def budget(self, task: str) -> float:
+        return self.budgets.get(task) or budget_ms(task)
+
+    def _usable(self, variant: ModelVariant, remote_available: bool) -> bool:
+        if self._failed_until.get(variant.key, 0) > time.time():
+            return False
+        if not variant.is_local:
+            return remote_available
+        if not self.enable_local:
+            return False
+        if variant.backend not in self._backend_ok:
+            self._backend_ok[variant.backend] = backend_available(variant.backend)
+        return self._backend_ok[variant.backend]
+
+    def estimate_ms(self, variant: ModelVariant) -> float:
+        measured = self.tracker.p90(variant.key)
+        return measured if measured is not None else variant.expected_ms
+
+    def candidates(self, task: str, remote_available: bool = True) -> List[ModelVariant]:
+        return [v for v in self.variants.get(task, []) if self._usable(v, remote_available)]
+
+    def select(self, task: str, remote_available: bool = True, probe: bool = True) -> Optional[ModelVariant]:
+        """Variant to run ``task`` on; ``probe=False`` only asks, without spending a re-probe"""
+        candidates = self.candidates(task, remote_available)
+        if not candidates:
+            return None
+        budget = self.budget(task)
+        chosen = next((v for v in candidates if self.estimate_ms(v) <= budget), None) or \
+            min(candidates, key=self.estimate_ms)
+        if not probe:
+            return chosen
+
+        now = time.time()
+        with self._lock:
+            for variant in candidates:
+                if variant is chosen:
+                    break
+                if now - self._last_selected.get(variant.key, self._started) >= REPROBE_SECONDS:
+                    chosen = variant
+                    break
+            self._last_selected[chosen.key] = now
+        return chosen
+
+    def record(self, variant: ModelVariant, ms: float) -> None:
+        self.tracker.record(variant.key, ms)
+
+    def mark_failed(self, variant: ModelVariant) -> None:
+        self._failed_until[variant.key] = time.time() + FAILURE_COOLDOWN_SECONDS
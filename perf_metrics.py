@@ -0,0 +1,267 @@
+"""
+Performance Metrics for Streamlit Finance Bot
+Process-wide latency histograms and counters with Prometheus text export
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Seconds; covers in-memory renders up to slow model cold starts
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside the matching bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, bound in enumerate(self.buckets):
+            if seen + self.counts[i] >= rank:
+                fraction = (rank - seen) / self.counts[i] if self.counts[i] else 0.0
+                return lower + (bound - lower) * fraction
+            seen += self.counts[i]
+            lower = bound
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    def increment(self, name: str, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + amount
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(_label_key(labels), 0.0)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def histogram_summary(self, name: str) -> List[Dict[str, object]]:
+        """One row per label set: count, mean, p50, p95 and max bucket (seconds)"""
+        with self._lock:
+            series = list(self._histograms.get(name, {}).items())
+        rows = []
+        for key, hist in sorted(series):
+            row: Dict[str, object] = dict(key)
+            row.update({
+                'count': hist.count,
+                'mean_ms': (hist.sum / hist.count) * 1000 if hist.count else 0.0,
+                'p50_ms': hist.quantile(0.5) * 1000,
+                'p95_ms': hist.quantile(0.95) * 1000
+            })
+            rows.append(row)
+        return rows
+
+    def counter_summary(self, name: str) -> List[Dict[str, object]]:
+        with self._lock:
+            series = list(self._counters.get(name, {}).items())
+        rows = []
+        for key, value in sorted(series):
+            row: Dict[str, object] = dict(key)
+            row['value'] = value
+            rows.append(row)
+        return rows
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{name}{_format_labels(key)} {value}")
+
+            for name, series in sorted(self._histograms.items()):
+                if name in self._help:
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key + (('le', repr(bound)),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key + (('le', '+Inf'),))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    parts = []
+    for k, v in key:
+        escaped = v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{k}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+registry = MetricsRegistry()
+
+HF_REQUEST_SECONDS = 'finance_bot_hf_request_seconds'
+CACHE_REQUESTS = 'finance_bot_cache_requests_total'
+FALLBACKS = 'finance_bot_fallbacks_total'
+PAGE_RENDER_SECONDS = 'finance_bot_page_render_seconds'
+FRAGMENT_RENDER_SECONDS = 'finance_bot_fragment_render_seconds'
+FUNCTION_SECONDS = 'finance_bot_function_seconds'
+CATEGORY_SOURCE = 'finance_bot_category_suggestions_total'
+
+registry.describe(HF_REQUEST_SECONDS, 'Hugging Face inference API request latency by model and outcome')
+registry.describe(CACHE_REQUESTS, 'Cache lookups by cache and result (hit/miss)')
+registry.describe(FALLBACKS, 'Times a static or keyword fallback replaced an AI result')
+registry.describe(PAGE_RENDER_SECONDS, 'Full page render time')
+registry.describe(FRAGMENT_RENDER_SECONDS, 'Fragment render time, including reruns of the fragment alone')
+registry.describe(FUNCTION_SECONDS, 'Time spent in instrumented functions')
+registry.describe(CATEGORY_SOURCE, 'Category suggestions by the source that answered (local/remote/keywords)')
+
+
+def record_fallback(kind: str) -> None:
+    registry.increment(FALLBACKS, kind=kind)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    registry.increment(CACHE_REQUESTS, cache=cache, result='hit' if hit else 'miss')
+
+
+def cache_hit_rates() -> Dict[str, float]:
+    """Hit rate per cache name"""
+    totals: Dict[str, Dict[str, float]] = {}
+    for row in registry.counter_summary(CACHE_REQUESTS):
+        totals.setdefault(row['cache'], {})[row['result']] = row['value']
+    return {
+        cache: counts.get('hit', 0.0) / (counts.get('hit', 0.0) + counts.get('miss', 0.0))
+        for cache, counts in totals.items()
+    }
+
+
+@contextmanager
+def timer(name: str, **labels):
+    """Record the duration of a block into histogram ``name``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(name, time.perf_counter() - start, **labels)
+
+
+def timed_as(name: str, **labels) -> Callable[[Callable], Callable]:
+    """Decorator recording each call into histogram ``name`` with fixed ``labels``"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def timed(func: Callable) -> Callable:
+    """Record each call of ``func`` into the function timing histogram"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with timer(FUNCTION_SECONDS, function=func.__qualname__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def write_prometheus_file(path: Optional[str] = None) -> str:
+    """Write the current metrics to ``path`` (or FINANCE_BOT_METRICS_FILE) atomically"""
+    path = path or os.getenv('FINANCE_BOT_METRICS_FILE', 'finance_bot_metrics.prom')
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(registry.render_prometheus())
+    os.replace(tmp_path, path)
+    return path
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') != '/metrics':
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: Optional[int] = None, host: Optional[str] = None) -> Optional[int]:
+    """
+    Serve /metrics on ``host``:``port`` (or FINANCE_BOT_METRICS_HOST, default localhost
+    only, and FINANCE_BOT_METRICS_PORT) from a daemon thread. Idempotent across
+    Streamlit reruns; returns the port, or None when disabled.
+    """
+    global _server
+    port = port or int(os.getenv('FINANCE_BOT_METRICS_PORT', '0') or 0)
+    if not port:
+        return None
+    host = host or os.getenv('FINANCE_BOT_METRICS_HOST', '127.0.0.1')
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name='finance-bot-metrics',
+                             daemon=True).start()
+        return _server.server_address[1]
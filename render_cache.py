@@ -0,0 +1,93 @@
+"""
+Render Cache for Streamlit Finance Bot
+Versioned session data and memoization of expensive derived page artifacts
+"""
+
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Tuple
+
+import streamlit as st
+from perf_metrics import FUNCTION_SECONDS, record_cache, timer
+
+VERSIONS_KEY = '_data_versions'
+CACHE_KEY = '_render_cache'
+DEFAULT_MAXSIZE = 32
+
+
+def _versions() -> Dict[str, int]:
+    if VERSIONS_KEY not in st.session_state:
+        st.session_state[VERSIONS_KEY] = {}
+    return st.session_state[VERSIONS_KEY]
+
+
+def data_version(collection: str) -> int:
+    """Current version of a stored collection (0 until first change)"""
+    return _versions().get(collection, 0)
+
+
+def bump_version(*collections: str) -> None:
+    """Mark collections as changed so artifacts derived from them are rebuilt"""
+    versions = _versions()
+    for collection in collections:
+        versions[collection] = versions.get(collection, 0) + 1
+
+
+def _freeze(value: Any) -> Any:
+    """Turn widget values (lists, dicts, sets) into hashable cache key parts"""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(_freeze(v) for v in value))
+    return value
+
+
+def _function_cache(name: str) -> 'OrderedDict[Tuple, Any]':
+    if CACHE_KEY not in st.session_state:
+        st.session_state[CACHE_KEY] = {}
+    caches = st.session_state[CACHE_KEY]
+    if name not in caches:
+        caches[name] = OrderedDict()
+    return caches[name]
+
+
+def memoize_on_version(*collections: str, maxsize: int = DEFAULT_MAXSIZE) -> Callable:
+    """
+    Memoize a render helper per session against the data versions of the given
+    collections plus its arguments. Entries are evicted least-recently-used once
+    more than ``maxsize`` are held. Cached results are shared between reruns, so
+    callers must treat them as read-only.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            cache = _function_cache(name)
+            key = (
+                tuple(data_version(c) for c in collections),
+                _freeze(args),
+                _freeze(kwargs),
+            )
+            if key in cache:
+                cache.move_to_end(key)
+                record_cache(func.__qualname__, hit=True)
+                return cache[key]
+
+            record_cache(func.__qualname__, hit=False)
+            with timer(FUNCTION_SECONDS, function=func.__qualname__):
+                result = func(*args, **kwargs)
+            cache[key] = result
+            while len(cache) > maxsize:
+                cache.popitem(last=False)
+            return result
+
+        def cache_clear() -> None:
+            _function_cache(name).clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+
+    return decorator
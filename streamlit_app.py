@@ -4,17 +4,51 @@ A comprehensive financial management tool with AI-powered insights using Hugging
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from streamlit.errors import StreamlitAPIException
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 from datetime import datetime, timedelta
+import math
 import os
 from dotenv import load_dotenv
-import json
+from finance_analytics import (CATEGORIES, GETTING_STARTED_INSIGHT, apply_transaction_filters, categorize_and_learn,
+                               export_data_json, learn_categories, parse_import_data, spending_by_period,
+                               spending_insights)
+from render_cache import bump_version, memoize_on_version
+from budgets import PERIODS, Budget, BudgetEngine, format_alert
+from currency import BASE_CURRENCY, DEFAULT_CURRENCY, format_money, fx_table_version, get_fx_table, to_reporting_currency
+from intent_router import answer_query, get_intent_router, prepare_frame
+from job_runner import get_job_runner
+import perf_metrics
+from perf_metrics import FRAGMENT_RENDER_SECONDS, PAGE_RENDER_SECONDS, record_fallback, timed, timed_as, timer
+from lazy_imports import IMPORT_SECONDS, lazy_import, preload_in_background
+from model_variants import MODEL_INFERENCE_SECONDS
+from huggingface_service import LoggingReporter, configure_reporting
+
+# Heavy libraries load on first use so the first page paints without them
+pd = lazy_import('pandas')
+px = lazy_import('plotly.express')
 
 # Load environment variables
 load_dotenv()
 
+class StreamlitReporter(LoggingReporter):
+    """Logs AI service problems and shows them in the page when raised on the script thread"""
+    
+    def warning(self, message):
+        super().warning(message)
+        if get_script_run_ctx(suppress_warning=True):
+            st.warning(message)
+    
+    def error(self, message):
+        super().error(message)
+        if get_script_run_ctx(suppress_warning=True):
+            st.error(message)
+
+configure_reporting(StreamlitReporter())
+
+# Expose /metrics when FINANCE_BOT_METRICS_PORT is set
+perf_metrics.start_metrics_server()
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="Finance Bot - AI Financial Assistant",
@@ -75,11 +109,18 @@ if 'goals' not in st.session_state:
     st.session_state.goals = []
 if 'chat_history' not in st.session_state:
     st.session_state.chat_history = []
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = {}
+if 'budgets' not in st.session_state:
+    st.session_state.budgets = BudgetEngine()
+if 'budgets_fx_version' not in st.session_state:
+    st.session_state.budgets_fx_version = fx_table_version()
 if 'user_profile' not in st.session_state:
     st.session_state.user_profile = {
         'name': 'Alex Johnson',
         'type': 'professional',
-        'balance': 12450.00
+        'balance': 12450.00,
+        'currency': DEFAULT_CURRENCY
     }
 
 def main():
@@ -100,7 +141,7 @@ def main():
         st.subheader("👤 Profile")
         st.write(f"**Name:** {st.session_state.user_profile['name']}")
         st.write(f"**Type:** {st.session_state.user_profile['type'].title()}")
-        st.write(f"**Balance:** ${st.session_state.user_profile['balance']:,.2f}")
+        st.write(f"**Balance:** {format_money(st.session_state.user_profile['balance'], reporting_currency())}")
         
         st.markdown("---")
         
@@ -112,20 +153,61 @@ def main():
             st.warning("🤖 AI Features: Limited")
             st.info("Add HF API key for full AI features")
 
+    sync_budgets_with_rates()
+    
     # Route to selected page
-    if page == "Dashboard":
-        show_dashboard()
-    elif page == "AI Chat":
-        show_ai_chat()
-    elif page == "Expense Tracking":
-        show_expense_tracking()
-    elif page == "Financial Goals":
-        show_financial_goals()
-    elif page == "Settings":
-        show_settings()
+    with timer(PAGE_RENDER_SECONDS, page=page):
+        if page == "Dashboard":
+            show_dashboard()
+        elif page == "AI Chat":
+            show_ai_chat()
+        elif page == "Expense Tracking":
+            show_expense_tracking()
+        elif page == "Financial Goals":
+            show_financial_goals()
+        elif page == "Settings":
+            show_settings()
+    
+    # Warm deferred imports once the first page is on screen (FINANCE_BOT_PRELOAD=1)
+    preload_in_background()
+
+def rerun_fragment():
+    """Rerun only the calling fragment; falls back to a full rerun when the fragment ran as part of one"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+def poll_while_pending(poller, pending, *args):
+    """Run a job poller as a fragment that reruns every second only while its job is pending"""
+    return st.fragment(poller, run_every=1 if pending else None)(*args)
+
+def reporting_currency():
+    """Currency that totals, charts, budgets and goals are shown in"""
+    return st.session_state.user_profile.get('currency', DEFAULT_CURRENCY)
+
+def sync_budgets_with_rates():
+    """Re-total budget spend after the shared rate table changed, possibly in another session"""
+    version = fx_table_version()
+    if st.session_state.budgets_fx_version == version:
+        return
+    if st.session_state.budgets.budgets:
+        st.session_state.budgets.reevaluate(get_reporting_df(reporting_currency(), version))
+    st.session_state.budgets_fx_version = version
+
+def from_base_currency(amount, currency):
+    """``amount`` in BASE_CURRENCY converted to ``currency`` at today's rate"""
+    if currency == BASE_CURRENCY:
+        return amount
+    return get_fx_table().convert(amount, BASE_CURRENCY, currency, datetime.now())
+
+def reporting_key():
+    """(currency, FX table version) that converted artifacts are cached by; doesn't load the table"""
+    return reporting_currency(), fx_table_version()
 
 def show_dashboard():
     st.header("📊 Financial Dashboard")
+    currency, fx_version = reporting_key()
     
     # Key metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -133,32 +215,39 @@ def show_dashboard():
     with col1:
         st.metric(
             label="Total Balance",
-            value=f"${st.session_state.user_profile['balance']:,.2f}",
+            value=format_money(st.session_state.user_profile['balance'], currency),
             delta="+2.5%"
         )
     
     with col2:
-        monthly_spending = sum([t['amount'] for t in st.session_state.transactions])
+        # This calendar month against the last, converted at each transaction's date
+        # No transactions: skip building a frame, which would import pandas on first paint
+        monthly = spending_totals(currency, fx_version, 'monthly') if st.session_state.transactions else {}
+        now = datetime.now()
+        monthly_spending = monthly.get(now.strftime('%Y-%m'), 0.0)
+        previous = monthly.get((now.replace(day=1) - timedelta(days=1)).strftime('%Y-%m'), 0.0)
         st.metric(
             label="Monthly Spending",
-            value=f"${monthly_spending:,.2f}",
-            delta="-15.2%"
+            value=format_money(monthly_spending, currency),
+            delta=f"{(monthly_spending - previous) / previous:+.1%}" if previous else None,
+            delta_color="inverse"
         )
     
     with col3:
-        savings_goal = 15000
-        current_savings = 8200
+        # Sample savings and investment figures are in USD
+        savings_goal = from_base_currency(15000, currency)
+        current_savings = from_base_currency(8200, currency)
         st.metric(
             label="Savings Progress",
-            value=f"${current_savings:,.2f}",
+            value=format_money(current_savings, currency),
             delta=f"{(current_savings/savings_goal)*100:.1f}% of goal"
         )
     
     with col4:
-        investment_value = 15680
+        investment_value = from_base_currency(15680, currency)
         st.metric(
             label="Investments",
-            value=f"${investment_value:,.2f}",
+            value=format_money(investment_value, currency),
             delta="+5.4%"
         )
 
@@ -170,10 +259,7 @@ def show_dashboard():
     with col1:
         # Spending chart
         if st.session_state.transactions:
-            df = pd.DataFrame(st.session_state.transactions)
-            fig = px.pie(df, values='amount', names='category', title='Spending by Category')
-            fig.update_layout(height=400)
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_spending_chart(currency, fx_version), use_container_width=True)
         else:
             st.info("Add some transactions to see spending analysis")
     
@@ -182,9 +268,36 @@ def show_dashboard():
         st.subheader("🤖 AI Insights")
         show_ai_insights()
 
+@memoize_on_version('transactions')
+def get_transactions_df():
+    """DataFrame view of the stored transactions"""
+    return pd.DataFrame(st.session_state.transactions)
+
+@memoize_on_version('transactions')
+def get_reporting_df(currency, fx_version):
+    """Transactions with amounts converted to ``currency`` at each transaction's date"""
+    return to_reporting_currency(get_transactions_df(), currency)
+
+@memoize_on_version('transactions')
+def spending_totals(currency, fx_version, period):
+    """Converted spend per period key, cached per (currency, period)"""
+    return spending_by_period(get_reporting_df(currency, fx_version), period)
+
+@memoize_on_version('transactions')
+def build_spending_chart(currency, fx_version):
+    """Spending-by-category pie chart"""
+    fig = px.pie(get_reporting_df(currency, fx_version), values='amount', names='category',
+                 title=f'Spending by Category ({currency})')
+    fig.update_layout(height=400)
+    return fig
+
 def show_ai_insights():
     """Display AI-powered financial insights"""
-    insights = generate_ai_insights()
+    # Budget alerts for the current period come first
+    if st.session_state.transactions:
+        insights = st.session_state.budgets.insights() + generate_ai_insights(*reporting_key())
+    else:
+        insights = [GETTING_STARTED_INSIGHT]
     
     for insight in insights:
         st.markdown(f"""
@@ -194,136 +307,154 @@ def show_ai_insights():
         </div>
         """, unsafe_allow_html=True)
 
-def generate_ai_insights():
+@memoize_on_version('transactions')
+def generate_ai_insights(currency, fx_version):
     """Generate AI insights based on transaction data"""
-    insights = []
-    
-    if not st.session_state.transactions:
-        return [{
-            'emoji': '💡',
-            'title': 'Getting Started',
-            'description': 'Add some transactions to get personalized AI insights about your spending patterns!'
-        }]
-    
-    # Analyze spending patterns
-    df = pd.DataFrame(st.session_state.transactions)
-    total_spent = df['amount'].sum()
-    avg_transaction = df['amount'].mean()
-    top_category = df.groupby('category')['amount'].sum().idxmax()
-    top_amount = df.groupby('category')['amount'].sum().max()
-    
-    # Generate insights
-    insights.append({
-        'emoji': '📊',
-        'title': 'Top Spending Category',
-        'description': f'Your highest spending is in {top_category} with ${top_amount:.2f}'
-    })
-    
-    # Check for large transactions
-    large_transactions = df[df['amount'] > avg_transaction * 2]
-    if len(large_transactions) > 0:
-        insights.append({
-            'emoji': '⚠️',
-            'title': 'Large Transactions Alert',
-            'description': f'You have {len(large_transactions)} unusually large transactions this period'
-        })
-    
-    # Spending trend
-    if len(df) >= 3:
-        recent_avg = df.tail(3)['amount'].mean()
-        if recent_avg > avg_transaction * 1.2:
-            insights.append({
-                'emoji': '📈',
-                'title': 'Spending Trend',
-                'description': 'Your recent spending is above average. Consider reviewing your budget.'
-            })
-        else:
-            insights.append({
-                'emoji': '🎉',
-                'title': 'Great Job!',
-                'description': 'Your recent spending is well controlled!'
-            })
-    
-    return insights
+    return spending_insights(get_reporting_df(currency, fx_version), currency)
 
 def show_ai_chat():
     st.header("🤖 AI Financial Assistant")
     
     # Chat interface
     st.subheader("💬 Chat with your AI Financial Advisor")
-    
+    chat_fragment()
+
+@st.fragment
+@timed_as(FRAGMENT_RENDER_SECONDS, fragment='chat')
+def chat_fragment():
+    """Chat history, input and quick questions; reruns without the rest of the app"""
     # Display chat history
     chat_container = st.container()
     with chat_container:
         for message in st.session_state.chat_history:
-            if message['role'] == 'user':
-                st.markdown(f"""
-                <div style="text-align: right; margin: 1rem 0;">
-                    <div style="background: #3b82f6; color: white; padding: 0.5rem 1rem; 
-                                border-radius: 1rem; display: inline-block; max-width: 70%;">
-                        {message['content']}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
-                <div style="text-align: left; margin: 1rem 0;">
-                    <div style="background: #f1f5f9; color: #1f2937; padding: 0.5rem 1rem; 
-                                border-radius: 1rem; display: inline-block; max-width: 70%;">
-                        🤖 {message['content']}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+            render_chat_message(message)
+        if 'chat' in st.session_state.jobs:
+            poll_while_pending(chat_job_poller, True)
     
     # Chat input
     user_input = st.text_input("Ask me anything about your finances:", key="chat_input")
     
     if st.button("Send", key="send_message") and user_input:
-        # Add user message
-        st.session_state.chat_history.append({
-            'role': 'user',
-            'content': user_input
-        })
-        
-        # Generate AI response
-        ai_response = generate_ai_response(user_input)
-        st.session_state.chat_history.append({
-            'role': 'assistant',
-            'content': ai_response
-        })
-        
-        st.rerun()
+        submit_chat_message(user_input)
     
     # Quick suggestions
     st.subheader("💡 Quick Questions")
-    col1, col2, col3 = st.columns(3)
+    col1, col2, col3, col4 = st.columns(4)
     
     with col1:
         if st.button("How should I budget?"):
-            handle_quick_question("How should I budget my income?")
+            submit_chat_message("How should I budget my income?")
     
     with col2:
         if st.button("Investment advice?"):
-            handle_quick_question("What investment advice do you have for me?")
+            submit_chat_message("What investment advice do you have for me?")
     
     with col3:
         if st.button("Reduce expenses?"):
-            handle_quick_question("How can I reduce my expenses?")
+            submit_chat_message("How can I reduce my expenses?")
+    
+    with col4:
+        if st.button("Spending this month?"):
+            submit_chat_message("How much did I spend this month?")
 
-def handle_quick_question(question):
+def render_chat_message(message):
+    if message['role'] == 'user':
+        st.markdown(f"""
+        <div style="text-align: right; margin: 1rem 0;">
+            <div style="background: #3b82f6; color: white; padding: 0.5rem 1rem; 
+                        border-radius: 1rem; display: inline-block; max-width: 70%;">
+                {message['content']}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.markdown(f"""
+        <div style="text-align: left; margin: 1rem 0;">
+            <div style="background: #f1f5f9; color: #1f2937; padding: 0.5rem 1rem; 
+                        border-radius: 1rem; display: inline-block; max-width: 70%;">
+                🤖 {message['content']}
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
+
+def submit_chat_message(question):
+    """Add a user message; data questions are answered at once, advice is generated in the background"""
+    if 'chat' in st.session_state.jobs:
+        st.warning("Still working on your previous question...")
+        return
+    
     st.session_state.chat_history.append({
         'role': 'user',
         'content': question
     })
     
-    ai_response = generate_ai_response(question)
-    st.session_state.chat_history.append({
-        'role': 'assistant',
-        'content': ai_response
-    })
+    query = get_intent_router().route(question)
+    if query is not None:
+        currency, fx_version = reporting_key()
+        st.session_state.chat_history.append({
+            'role': 'assistant',
+            'content': answer_query(query, get_query_frame(currency, fx_version), currency)
+        })
+    else:
+        start_job('chat', generate_ai_response, question)
+    bump_version('chat_history')
+    rerun_fragment()
+
+@memoize_on_version('transactions')
+def get_query_frame(currency, fx_version):
+    """Converted transactions with parsed dates for answering chat data questions"""
+    return prepare_frame(get_reporting_df(currency, fx_version))
+
+@timed_as(FRAGMENT_RENDER_SECONDS, fragment='chat_job_poller')
+def chat_job_poller():
+    """Polls the pending AI reply and hands it off into the chat history"""
+    status = poll_job('chat')
+    if status is not None and status['status'] in ('pending', 'running'):
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.caption(f"🤖 Thinking... ({status['elapsed']:.0f}s)")
+        with col2:
+            if st.button("Cancel", key="cancel_chat_job"):
+                get_job_runner().cancel(st.session_state.jobs['chat'])
+        return
     
+    if status is not None and status['status'] in ('done', 'failed'):
+        if status['status'] == 'done':
+            content = status['result']
+        else:
+            content = get_static_financial_response(st.session_state.chat_history[-1]['content'])
+        st.session_state.chat_history.append({'role': 'assistant', 'content': content})
+        bump_version('chat_history')
+    # The reply is rendered by the chat history, which this fragment's reruns don't redraw;
+    # the full rerun also drops this poller, so it stops ticking
     st.rerun()
 
+def start_job(slot, func, *args, kind='io', **kwargs):
+    """Run slow work on the background job runner under a named session slot"""
+    runner = get_job_runner()
+    submit = runner.submit_cpu if kind == 'cpu' else runner.submit_io
+    st.session_state.jobs[slot] = submit(func, *args, **kwargs)
+
+def poll_job(slot):
+    """Status of the job in a session slot; finished jobs carry their result and free the slot"""
+    job_id = st.session_state.jobs.get(slot)
+    if job_id is None:
+        return None
+    
+    runner = get_job_runner()
+    status = runner.status(job_id)
+    if status is None:
+        del st.session_state.jobs[slot]
+        return None
+    
+    if status['status'] in ('done', 'failed', 'cancelled'):
+        if status['status'] == 'done':
+            status['result'] = runner.result(job_id)
+        runner.forget(job_id)
+        del st.session_state.jobs[slot]
+    return status
+
+@timed
 def generate_ai_response(user_input):
     """Generate AI response using Hugging Face or fallback responses"""
     # Try to use Hugging Face API
@@ -332,6 +463,7 @@ def generate_ai_response(user_input):
         return get_financial_advice(user_input)
     except Exception as e:
         # Fallback to static responses
+        record_fallback('chat')
         return get_static_financial_response(user_input)
 
 def get_static_financial_response(message):
@@ -358,6 +490,22 @@ def get_static_financial_response(message):
 
 def show_expense_tracking():
     st.header("💳 Expense Tracking")
+    expense_tracking_fragment()
+
+@st.fragment
+@timed_as(FRAGMENT_RENDER_SECONDS, fragment='expense_tracking')
+def expense_tracking_fragment():
+    """Expense form and transaction list; reruns without the rest of the app"""
+    sync_budgets_with_rates()
+    
+    # Messages from the last submit survive the fragment rerun
+    for level, message in st.session_state.pop('expense_notices', []):
+        getattr(st, level)(message)
+    pending = any(slot.startswith('categorize:') for slot in st.session_state.jobs)
+    if pending or st.session_state.get('category_suggestions'):
+        poll_while_pending(categorize_job_poller, pending)
+    
+    currency, fx_version = reporting_key()
     
     # Add expense form
     with st.expander("➕ Add New Expense", expanded=True):
@@ -365,12 +513,13 @@ def show_expense_tracking():
         
         with col1:
             merchant = st.text_input("Merchant/Description")
-            amount = st.number_input("Amount ($)", min_value=0.01, step=0.01)
+            amount = st.number_input("Amount", min_value=0.01, step=0.01)
+            currencies = get_fx_table().currencies
+            expense_currency = st.selectbox("Currency", currencies,
+                                            index=currencies.index(currency) if currency in currencies else 0)
         
         with col2:
-            categories = ["Food & Dining", "Transportation", "Shopping", "Entertainment", 
-                         "Bills & Utilities", "Healthcare", "Travel", "Education", "Other"]
-            category = st.selectbox("Category", categories)
+            category = st.selectbox("Category", CATEGORIES)
             date = st.date_input("Date", datetime.now())
         
         with col3:
@@ -380,15 +529,13 @@ def show_expense_tracking():
         
         if st.button("💾 Add Expense", type="primary"):
             if merchant and amount > 0:
-                # AI-powered category suggestion
-                suggested_category = suggest_category(merchant, notes)
-                if suggested_category and suggested_category != category:
-                    st.info(f"🤖 AI suggests category: {suggested_category}")
+                notices = []
                 
                 new_expense = {
                     'id': len(st.session_state.transactions) + 1,
                     'merchant': merchant,
                     'amount': amount,
+                    'currency': expense_currency,
                     'category': category,
                     'date': date.strftime('%Y-%m-%d'),
                     'payment_method': payment_method,
@@ -397,33 +544,46 @@ def show_expense_tracking():
                 }
                 
                 st.session_state.transactions.append(new_expense)
-                st.success("✅ Expense added successfully!")
-                st.rerun()
+                st.session_state.category_suggestions = []
+                bump_version('transactions')
+                
+                # AI-powered category suggestion, then learning the chosen category as a confirmed label;
+                # both touch the model (and possibly the remote API or disk), so they run in the background
+                start_job(f"categorize:{new_expense['id']}", categorize_and_learn, dict(new_expense))
+                
+                # Budgets are kept in the reporting currency
+                converted = amount if expense_currency == currency else \
+                    get_fx_table().convert(amount, expense_currency, currency, date)
+                for alert in st.session_state.budgets.add_transaction({**new_expense, 'amount': converted}):
+                    level = 'error' if alert['threshold'] >= 1.0 else 'warning'
+                    notices.append((level, f"💸 Budget alert: {format_alert(alert, currency)}"))
+                
+                notices.append(('success', "✅ Expense added successfully!"))
+                st.session_state.expense_notices = notices
+                rerun_fragment()
+    
+    with st.expander("💵 Category Budgets"):
+        show_budgets()
     
     # Display transactions
     if st.session_state.transactions:
         st.subheader("📋 Recent Transactions")
         
-        df = pd.DataFrame(st.session_state.transactions)
+        df = get_reporting_df(currency, fx_version)
         
         # Filters
         col1, col2, col3 = st.columns(3)
         with col1:
             category_filter = st.multiselect("Filter by Category", df['category'].unique())
         with col2:
-            amount_range = st.slider("Amount Range", 0, int(df['amount'].max()), (0, int(df['amount'].max())))
+            # Round up so converted (fractional) maximums stay inside the default range
+            max_amount = math.ceil(df['amount'].max())
+            amount_range = st.slider(f"Amount Range ({currency})", 0, max_amount, (0, max_amount))
         with col3:
             date_range = st.date_input("Date Range", [datetime.now() - timedelta(days=30), datetime.now()])
         
         # Apply filters
-        filtered_df = df.copy()
-        if category_filter:
-            filtered_df = filtered_df[filtered_df['category'].isin(category_filter)]
-        
-        filtered_df = filtered_df[
-            (filtered_df['amount'] >= amount_range[0]) & 
-            (filtered_df['amount'] <= amount_range[1])
-        ]
+        filtered_df = filter_transactions(currency, fx_version, category_filter, amount_range)
         
         # Display transactions
         for _, transaction in filtered_df.iterrows():
@@ -435,7 +595,8 @@ def show_expense_tracking():
                         <small>{transaction['category']} • {transaction['date']}</small>
                     </div>
                     <div style="text-align: right;">
-                        <strong style="font-size: 1.2em;">${transaction['amount']:.2f}</strong><br>
+                        <strong style="font-size: 1.2em;">{format_money(transaction['original_amount'], transaction['currency'])}</strong><br>
+                        {f"<small>≈ {format_money(transaction['amount'], currency)}</small><br>" if transaction['currency'] != currency else ""}
                         <small>{transaction['payment_method']}</small>
                     </div>
                 </div>
@@ -448,39 +609,80 @@ def show_expense_tracking():
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            st.metric("Total Spent", f"${filtered_df['amount'].sum():.2f}")
+            st.metric("Total Spent", format_money(filtered_df['amount'].sum(), currency))
         with col2:
-            st.metric("Average Transaction", f"${filtered_df['amount'].mean():.2f}")
+            st.metric("Average Transaction", format_money(filtered_df['amount'].mean(), currency))
         with col3:
             st.metric("Number of Transactions", len(filtered_df))
         with col4:
-            st.metric("Largest Expense", f"${filtered_df['amount'].max():.2f}")
+            st.metric("Largest Expense", format_money(filtered_df['amount'].max(), currency))
     
     else:
         st.info("No transactions yet. Add your first expense above!")
 
-def suggest_category(merchant, notes=""):
-    """AI-powered category suggestion"""
-    # Simple keyword-based categorization (fallback)
-    text = f"{merchant} {notes}".lower()
-    
-    if any(word in text for word in ['restaurant', 'coffee', 'food', 'pizza', 'burger', 'starbucks']):
-        return "Food & Dining"
-    elif any(word in text for word in ['gas', 'uber', 'taxi', 'bus', 'train', 'parking']):
-        return "Transportation"
-    elif any(word in text for word in ['amazon', 'target', 'walmart', 'shopping', 'store']):
-        return "Shopping"
-    elif any(word in text for word in ['netflix', 'spotify', 'movie', 'entertainment', 'game']):
-        return "Entertainment"
-    elif any(word in text for word in ['electric', 'water', 'internet', 'phone', 'utility', 'bill']):
-        return "Bills & Utilities"
-    elif any(word in text for word in ['doctor', 'hospital', 'pharmacy', 'medical', 'health']):
-        return "Healthcare"
-    else:
-        return "Other"
+def categorize_job_poller():
+    """Shows category suggestions for the expenses added since the last submit, polling the pending ones"""
+    slots = [slot for slot in st.session_state.jobs if slot.startswith('categorize:')]
+    # Once the last suggestion is in, ticks until the next rerun of the expense fragment
+    # (which drops this poller) only redraw the suggestions and are left out of the timings
+    if slots:
+        collect_category_suggestions(slots)
+    
+    for message in st.session_state.get('category_suggestions', []):
+        st.info(message)
+    if any(slot in st.session_state.jobs for slot in slots):
+        st.caption("🤖 Suggesting categories...")
+
+@timed_as(FRAGMENT_RENDER_SECONDS, fragment='categorize_job_poller')
+def collect_category_suggestions(slots):
+    """Poll categorize jobs and keep the suggestions that differ from the chosen category"""
+    suggestions = st.session_state.setdefault('category_suggestions', [])
+    for slot in slots:
+        status = poll_job(slot)
+        if status is None or status['status'] != 'done':
+            continue
+        expense_id = int(slot.split(':', 1)[1])
+        expense = next((t for t in st.session_state.transactions if t['id'] == expense_id), None)
+        if expense and status['result'] and status['result'] != expense['category']:
+            suggestions.append(f"🤖 AI suggests category {status['result']} for {expense['merchant']}")
+
+def show_budgets():
+    """Current-period spend against each budget, and the form to set or remove budgets"""
+    engine = st.session_state.budgets
+    currency, fx_version = reporting_key()
+    
+    for row in engine.status():
+        st.progress(min(row['used'], 1.0), text=f"{'🚨 ' if row['spent'] > row['limit'] else ''}"
+                                                f"{format_alert(row, currency)} · {row['period_key']}")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        budget_category = st.selectbox("Budget Category", CATEGORIES)
+    with col2:
+        budget_period = st.selectbox("Period", PERIODS, index=PERIODS.index('monthly'))
+    with col3:
+        budget_limit = st.number_input(f"Limit ({currency})", min_value=1.0, value=500.0, step=50.0)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("💾 Save Budget"):
+            # A new budget is evaluated against the full history in one vectorized pass
+            engine.set_budget(Budget(budget_category, budget_period, budget_limit),
+                              get_reporting_df(currency, fx_version))
+            rerun_fragment()
+    with col2:
+        if (budget_category, budget_period) in engine.budgets and st.button("🗑️ Remove Budget"):
+            engine.remove_budget(budget_category, budget_period)
+            rerun_fragment()
+
+@memoize_on_version('transactions')
+def filter_transactions(currency, fx_version, category_filter, amount_range):
+    """Transactions matching the expense tracking filters, amounts in ``currency``"""
+    return apply_transaction_filters(get_reporting_df(currency, fx_version), category_filter, amount_range)
 
 def show_financial_goals():
     st.header("🎯 Financial Goals")
+    currency = reporting_currency()
     
     # Add goal form
     with st.expander("➕ Add New Goal", expanded=True):
@@ -488,14 +690,14 @@ def show_financial_goals():
         
         with col1:
             goal_name = st.text_input("Goal Name")
-            target_amount = st.number_input("Target Amount ($)", min_value=1.0, step=100.0)
-            current_amount = st.number_input("Current Amount ($)", min_value=0.0, step=10.0)
+            target_amount = st.number_input(f"Target Amount ({currency})", min_value=1.0, step=100.0)
+            current_amount = st.number_input(f"Current Amount ({currency})", min_value=0.0, step=10.0)
         
         with col2:
             goal_types = ["Emergency Fund", "Vacation", "Car", "House", "Investment", "Education", "Other"]
             goal_type = st.selectbox("Goal Type", goal_types)
             target_date = st.date_input("Target Date", datetime.now() + timedelta(days=365))
-            monthly_contribution = st.number_input("Monthly Contribution ($)", min_value=0.0, step=25.0)
+            monthly_contribution = st.number_input(f"Monthly Contribution ({currency})", min_value=0.0, step=25.0)
         
         if st.button("🎯 Add Goal", type="primary"):
             if goal_name and target_amount > 0:
@@ -511,6 +713,7 @@ def show_financial_goals():
                 }
                 
                 st.session_state.goals.append(new_goal)
+                bump_version('goals')
                 st.success("✅ Goal added successfully!")
                 st.rerun()
     
@@ -519,67 +722,111 @@ def show_financial_goals():
         st.subheader("📈 Your Goals")
         
         for goal in st.session_state.goals:
-            progress = (goal['current_amount'] / goal['target_amount']) * 100
-            remaining = goal['target_amount'] - goal['current_amount']
-            
-            st.markdown(f"""
-            <div style="background: white; padding: 1.5rem; border-radius: 0.5rem; 
-                        box-shadow: 0 1px 3px rgba(0,0,0,0.1); margin: 1rem 0;">
-                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
-                    <h3 style="margin: 0; color: #1f2937;">{goal['name']}</h3>
-                    <span style="background: #3b82f6; color: white; padding: 0.25rem 0.75rem; 
-                                border-radius: 1rem; font-size: 0.875rem;">{goal['type']}</span>
-                </div>
-                
-                <div style="margin-bottom: 1rem;">
-                    <div style="background: #e5e7eb; height: 0.5rem; border-radius: 0.25rem; overflow: hidden;">
-                        <div style="background: linear-gradient(90deg, #10b981, #059669); height: 100%; 
-                                    width: {min(progress, 100)}%; transition: width 0.3s ease;"></div>
-                    </div>
-                    <div style="display: flex; justify-content: space-between; margin-top: 0.5rem; font-size: 0.875rem; color: #6b7280;">
-                        <span>${goal['current_amount']:,.2f} of ${goal['target_amount']:,.2f}</span>
-                        <span>{progress:.1f}% complete</span>
-                    </div>
-                </div>
-                
-                <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; font-size: 0.875rem;">
-                    <div>
-                        <strong>Remaining:</strong><br>
-                        ${remaining:,.2f}
-                    </div>
-                    <div>
-                        <strong>Target Date:</strong><br>
-                        {goal['target_date']}
-                    </div>
-                    <div>
-                        <strong>Monthly Goal:</strong><br>
-                        ${goal['monthly_contribution']:,.2f}
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Add progress button
-            col1, col2, col3 = st.columns([1, 1, 2])
-            with col1:
-                if st.button(f"Add Progress", key=f"progress_{goal['id']}"):
-                    contribution = st.number_input(
-                        f"Add to {goal['name']}", 
-                        min_value=0.01, 
-                        step=10.0, 
-                        key=f"contrib_{goal['id']}"
-                    )
-                    if contribution:
-                        # Update goal progress
-                        for i, g in enumerate(st.session_state.goals):
-                            if g['id'] == goal['id']:
-                                st.session_state.goals[i]['current_amount'] += contribution
-                                break
-                        st.success(f"Added ${contribution:.2f} to {goal['name']}!")
-                        st.rerun()
+            goal_fragment(goal['id'])
     else:
         st.info("No goals set yet. Add your first financial goal above!")
 
+@st.fragment
+@timed_as(FRAGMENT_RENDER_SECONDS, fragment='goal')
+def goal_fragment(goal_id):
+    """Card and progress controls for one goal; reruns without the rest of the app"""
+    goal = next((g for g in st.session_state.goals if g['id'] == goal_id), None)
+    if goal is None:
+        return
+    
+    st.markdown(build_goal_card(goal_id, reporting_currency()), unsafe_allow_html=True)
+    
+    notice_key = f"goal_notice_{goal_id}"
+    if notice_key in st.session_state:
+        st.success(st.session_state.pop(notice_key))
+    
+    # Add progress controls
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        contribution = st.number_input(
+            f"Add to {goal['name']}", 
+            min_value=0.01, 
+            step=10.0, 
+            key=f"contrib_{goal_id}"
+        )
+    with col2:
+        if st.button("Add Progress", key=f"progress_{goal_id}"):
+            goal['current_amount'] += contribution
+            bump_version('goals')
+            st.session_state[notice_key] = f"Added {format_money(contribution, reporting_currency())} to {goal['name']}!"
+            rerun_fragment()
+
+@memoize_on_version('goals', maxsize=128)
+def build_goal_card(goal_id, currency):
+    """HTML progress card for one stored goal"""
+    goal = next(g for g in st.session_state.goals if g['id'] == goal_id)
+    progress = (goal['current_amount'] / goal['target_amount']) * 100
+    remaining = goal['target_amount'] - goal['current_amount']
+    
+    return f"""
+    <div style="background: white; padding: 1.5rem; border-radius: 0.5rem; 
+                box-shadow: 0 1px 3px rgba(0,0,0,0.1); margin: 1rem 0;">
+        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 1rem;">
+            <h3 style="margin: 0; color: #1f2937;">{goal['name']}</h3>
+            <span style="background: #3b82f6; color: white; padding: 0.25rem 0.75rem; 
+                        border-radius: 1rem; font-size: 0.875rem;">{goal['type']}</span>
+        </div>
+        
+        <div style="margin-bottom: 1rem;">
+            <div style="background: #e5e7eb; height: 0.5rem; border-radius: 0.25rem; overflow: hidden;">
+                <div style="background: linear-gradient(90deg, #10b981, #059669); height: 100%; 
+                            width: {min(progress, 100)}%; transition: width 0.3s ease;"></div>
+            </div>
+            <div style="display: flex; justify-content: space-between; margin-top: 0.5rem; font-size: 0.875rem; color: #6b7280;">
+                <span>{format_money(goal['current_amount'], currency)} of {format_money(goal['target_amount'], currency)}</span>
+                <span>{progress:.1f}% complete</span>
+            </div>
+        </div>
+        
+        <div style="display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; font-size: 0.875rem;">
+            <div>
+                <strong>Remaining:</strong><br>
+                {format_money(remaining, currency)}
+            </div>
+            <div>
+                <strong>Target Date:</strong><br>
+                {goal['target_date']}
+            </div>
+            <div>
+                <strong>Monthly Goal:</strong><br>
+                {format_money(goal['monthly_contribution'], currency)}
+            </div>
+        </div>
+    </div>
+    """
+
+@timed_as(FRAGMENT_RENDER_SECONDS, fragment='import_job_poller')
+def import_job_poller():
+    """Polls a background import and swaps the imported data into the session"""
+    status = poll_job('import')
+    if status is None or status['status'] == 'cancelled':
+        st.rerun()
+    
+    if status['status'] == 'failed':
+        st.session_state.import_notice = ('error', f"Import failed: {status['error']}")
+        st.rerun()
+    elif status['status'] == 'done':
+        import_data = status['result']
+        st.session_state.transactions = import_data.get('transactions', [])
+        st.session_state.goals = import_data.get('goals', [])
+        st.session_state.user_profile.update(import_data.get('user_profile', {}))
+        bump_version('transactions', 'goals')
+        if 'budgets' in import_data:
+            st.session_state.budgets = BudgetEngine.from_list(import_data['budgets'], reporting_currency())
+        st.session_state.budgets.currency = reporting_currency()
+        st.session_state.budgets.reevaluate(get_reporting_df(*reporting_key()))
+        get_job_runner().submit_io(learn_categories, st.session_state.transactions)
+        st.session_state.import_notice = ('success', "Data imported successfully!")
+        # The full rerun redraws every page section and drops this poller, so it stops ticking
+        st.rerun()
+    else:
+        st.caption("📥 Importing...")
+
 def show_settings():
     st.header("⚙️ Settings")
     
@@ -593,20 +840,38 @@ def show_settings():
                                 index=0 if st.session_state.user_profile['type'] == 'professional' else 1)
     
     with col2:
-        balance = st.number_input("Current Balance ($)", 
+        currency = reporting_currency()
+        balance = st.number_input(f"Current Balance ({currency})", 
                                  value=st.session_state.user_profile['balance'], 
                                  step=100.0)
+        currencies = get_fx_table().currencies
+        new_currency = st.selectbox("Reporting Currency", currencies,
+                                    index=currencies.index(currency) if currency in currencies else 0,
+                                    help="Totals, charts, budgets and goals are shown in this currency; "
+                                         "budget limits, goals and the balance are converted at today's rate")
     
     if st.button("💾 Save Profile"):
+        rate = 1.0 if new_currency == currency else get_fx_table().convert(1.0, currency, new_currency, datetime.now())
         st.session_state.user_profile.update({
             'name': name,
             'type': user_type,
-            'balance': balance
+            'balance': round(balance * rate, 2),
+            'currency': new_currency
         })
+        if new_currency != currency:
+            convert_goals(rate)
+            # Transactions are converted at their own dates, limits at today's rate
+            st.session_state.budgets.change_currency(new_currency, rate, get_reporting_df(*reporting_key()))
         st.success("Profile updated successfully!")
     
     st.markdown("---")
     
+    # Exchange rates
+    st.subheader("💱 Exchange Rates")
+    show_exchange_rates()
+    
+    st.markdown("---")
+    
     # AI Configuration
     st.subheader("🤖 AI Configuration")
     
@@ -630,30 +895,25 @@ def show_settings():
     with col1:
         if st.button("📤 Export Data"):
             # Export data as JSON
-            export_data = {
-                'transactions': st.session_state.transactions,
-                'goals': st.session_state.goals,
-                'user_profile': st.session_state.user_profile
-            }
             st.download_button(
                 label="Download Data",
-                data=json.dumps(export_data, indent=2),
+                data=export_data_json(st.session_state.transactions,
+                                      st.session_state.goals,
+                                      st.session_state.user_profile,
+                                      st.session_state.budgets.to_list()),
                 file_name=f"finance_bot_data_{datetime.now().strftime('%Y%m%d')}.json",
                 mime="application/json"
             )
     
     with col2:
         uploaded_file = st.file_uploader("📥 Import Data", type="json")
-        if uploaded_file and st.button("Import"):
-            try:
-                import_data = json.load(uploaded_file)
-                st.session_state.transactions = import_data.get('transactions', [])
-                st.session_state.goals = import_data.get('goals', [])
-                st.session_state.user_profile.update(import_data.get('user_profile', {}))
-                st.success("Data imported successfully!")
-                st.rerun()
-            except Exception as e:
-                st.error(f"Import failed: {str(e)}")
+        if uploaded_file and st.button("Import") and 'import' not in st.session_state.jobs:
+            start_job('import', parse_import_data, uploaded_file.getvalue())
+        if 'import_notice' in st.session_state:
+            level, message = st.session_state.pop('import_notice')
+            getattr(st, level)(message)
+        if 'import' in st.session_state.jobs:
+            poll_while_pending(import_job_poller, True)
     
     with col3:
         if st.button("🗑️ Clear All Data", type="secondary"):
@@ -661,8 +921,99 @@ def show_settings():
                 st.session_state.transactions = []
                 st.session_state.goals = []
                 st.session_state.chat_history = []
+                st.session_state.budgets.reset()
+                st.session_state.category_suggestions = []
+                bump_version('transactions', 'goals', 'chat_history')
                 st.success("All data cleared!")
                 st.rerun()
+    
+    st.markdown("---")
+    
+    # Admin: performance instrumentation
+    with st.expander("📈 Performance (Admin)"):
+        show_performance_metrics()
+
+def convert_goals(rate):
+    """Multiply every goal amount by ``rate`` when the reporting currency changes"""
+    for goal in st.session_state.goals:
+        for field in ('target_amount', 'current_amount', 'monthly_contribution'):
+            goal[field] = round(goal[field] * rate, 2)
+    bump_version('goals')
+
+def show_exchange_rates():
+    """Coverage of the local FX rate table and CSV upload of new rates"""
+    table = get_fx_table()
+    
+    if len(table.rates):
+        coverage = table.rates.groupby('currency')['date'].agg(['min', 'max', 'count']).reset_index()
+        coverage.columns = ['currency', 'from', 'to', 'rates']
+        st.dataframe(coverage, use_container_width=True, hide_index=True)
+    else:
+        st.caption("No exchange rates loaded; only the base currency can be converted")
+    
+    rates_file = st.file_uploader("📥 Upload Rates (CSV: date, currency, rate in USD per unit)", type="csv")
+    if rates_file and st.button("Update Rates"):
+        try:
+            added = table.update(pd.read_csv(rates_file))
+        except (KeyError, ValueError) as e:
+            st.error(f"Could not read rates: {e}")
+            return
+        table.save()
+        sync_budgets_with_rates()
+        st.success(f"Loaded {added} rates")
+
+def show_performance_metrics():
+    """Latency histograms, cache hit rates and fallback counts for this process"""
+    registry = perf_metrics.registry
+    
+    sections = [
+        ("Page renders", perf_metrics.PAGE_RENDER_SECONDS),
+        ("Fragment renders", perf_metrics.FRAGMENT_RENDER_SECONDS),
+        ("Functions", perf_metrics.FUNCTION_SECONDS),
+        ("Hugging Face requests", perf_metrics.HF_REQUEST_SECONDS),
+        ("Model variants", MODEL_INFERENCE_SECONDS),
+        ("First imports", IMPORT_SECONDS),
+    ]
+    for title, name in sections:
+        st.markdown(f"**{title}**")
+        rows = registry.histogram_summary(name)
+        if rows:
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No samples yet")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Cache hit rates**")
+        hit_rates = perf_metrics.cache_hit_rates()
+        if hit_rates:
+            st.dataframe(pd.DataFrame([{'cache': k, 'hit_rate': f"{v:.1%}"} for k, v in hit_rates.items()]),
+                         use_container_width=True, hide_index=True)
+        else:
+            st.caption("No samples yet")
+    with col2:
+        st.markdown("**Fallbacks**")
+        fallbacks = registry.counter_summary(perf_metrics.FALLBACKS)
+        if fallbacks:
+            st.dataframe(pd.DataFrame(fallbacks), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No fallbacks recorded")
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            label="Download metrics",
+            data=registry.render_prometheus(),
+            file_name="finance_bot_metrics.prom",
+            mime="text/plain"
+        )
+    with col2:
+        if st.button("Write metrics file"):
+            st.success(f"Metrics written to {perf_metrics.write_prometheus_file()}")
+    with col3:
+        if st.button("Reset metrics"):
+            registry.reset()
+            st.rerun()
 
 if __name__ == "__main__":
     main()
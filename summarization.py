@@ -0,0 +1,186 @@
+"""
+Map-Reduce Summarization for Finance Bot
+Splits long statements and transcripts into model-sized chunks, summarizes them in
+parallel batches and reduces the partial summaries hierarchically
+"""
+
+import hashlib
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+# facebook/bart-large-cnn accepts 1024 tokens; keep headroom for special tokens
+DEFAULT_MAX_INPUT_TOKENS = 900
+# Chunks end on a "content-defined" sentence once past this size, so edits early in a
+# document do not shift every later chunk boundary (and invalidate its cached summary)
+DEFAULT_MIN_CHUNK_TOKENS = 300
+BOUNDARY_DIVISOR = 4
+
+CHUNK_SUMMARY_MAX_LENGTH = 150
+CHUNK_SUMMARY_MIN_LENGTH = 30
+
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+# (texts, max_length, min_length) -> one summary per text, None where it failed
+SummarizeBatch = Callable[[List[str], int, int], List[Optional[str]]]
+
+
+def count_tokens(text: str) -> int:
+    """Approximate BART BPE token count; words split into ~1.3 sub-word tokens on average"""
+    return int(len(_TOKEN_RE.findall(text)) * 1.3) + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s.strip() for s in _SENTENCE_RE.split(text) if s and s.strip()]
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> List[str]:
+    words = sentence.split()
+    step = max(1, int(max_tokens / 1.3) - 1)
+    return [' '.join(words[i:i + step]) for i in range(0, len(words), step)]
+
+
+def chunk_text(text: str, max_tokens: int = DEFAULT_MAX_INPUT_TOKENS,
+               min_tokens: int = DEFAULT_MIN_CHUNK_TOKENS) -> List[str]:
+    """Pack whole sentences into chunks of at most ``max_tokens``"""
+    chunks = []
+    current: List[str] = []
+    current_tokens = 0
+
+    def flush():
+        nonlocal current, current_tokens
+        if current:
+            chunks.append(' '.join(current))
+        current, current_tokens = [], 0
+
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        pieces = [sentence] if tokens <= max_tokens else _split_long_sentence(sentence, max_tokens)
+        for piece in pieces:
+            piece_tokens = tokens if len(pieces) == 1 else count_tokens(piece)
+            if current and current_tokens + piece_tokens > max_tokens:
+                flush()
+            current.append(piece)
+            current_tokens += piece_tokens
+            if current_tokens >= min_tokens and zlib.crc32(piece.encode('utf-8')) % BOUNDARY_DIVISOR == 0:
+                flush()
+    flush()
+    return chunks
+
+
+class SummaryCache:
+    """Thread-safe LRU of chunk summaries keyed by chunk content and generation settings"""
+
+    def __init__(self, maxsize: int = 2048):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str, model: str, max_length: int, min_length: int) -> str:
+        digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{model}:{max_length}:{min_length}:{digest}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, summary: str) -> None:
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _extractive_fallback(text: str, max_tokens: int) -> str:
+    """Leading sentences of ``text``, used when the model could not summarize a chunk"""
+    picked = []
+    used = 0
+    for sentence in split_sentences(text):
+        tokens = count_tokens(sentence)
+        if picked and used + tokens > max_tokens:
+            break
+        picked.append(sentence)
+        used += tokens
+    return ' '.join(picked)
+
+
+class MapReduceSummarizer:
+    """
+    Summarize text of any length with a fixed-window model: chunk, summarize chunks
+    in parallel batches (reusing cached chunk summaries), then repeat on the joined
+    summaries until they fit a single final call.
+    """
+
+    def __init__(self, summarize_batch: SummarizeBatch, model: str = 'summarizer',
+                 max_input_tokens: int = DEFAULT_MAX_INPUT_TOKENS, batch_size: int = 4,
+                 max_workers: int = 4, cache: Optional[SummaryCache] = None,
+                 on_fallback: Optional[Callable[[], None]] = None):
+        self.summarize_batch = summarize_batch
+        self.model = model
+        self.max_input_tokens = max_input_tokens
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.cache = cache if cache is not None else SummaryCache()
+        self.on_fallback = on_fallback
+
+    def _map(self, chunks: List[str], max_length: int, min_length: int) -> List[str]:
+        keys = [SummaryCache.key(c, self.model, max_length, min_length) for c in chunks]
+        summaries: List[Optional[str]] = [self.cache.get(k) for k in keys]
+        todo = [i for i, s in enumerate(summaries) if s is None]
+
+        batches = [todo[i:i + self.batch_size] for i in range(0, len(todo), self.batch_size)]
+
+        def run(batch: List[int]) -> List[Optional[str]]:
+            return self.summarize_batch([chunks[i] for i in batch], max_length, min_length)
+
+        if len(batches) > 1 and self.max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+                results = list(pool.map(run, batches))
+        else:
+            results = [run(batch) for batch in batches]
+
+        for batch, batch_results in zip(batches, results):
+            for i, summary in zip(batch, batch_results):
+                if summary:
+                    summaries[i] = summary
+                    self.cache.put(keys[i], summary)
+                else:
+                    if self.on_fallback:
+                        self.on_fallback()
+                    summaries[i] = _extractive_fallback(chunks[i], max_length)
+        return [s or '' for s in summaries]
+
+    def summarize(self, text: str, max_length: int = 100, min_length: int = 30,
+                  max_rounds: int = 6) -> Optional[str]:
+        """Final summary of ``text``, or None if the final model call failed"""
+        for _ in range(max_rounds):
+            if count_tokens(text) <= self.max_input_tokens:
+                break
+            chunks = chunk_text(text, self.max_input_tokens)
+            partials = self._map(chunks, CHUNK_SUMMARY_MAX_LENGTH, CHUNK_SUMMARY_MIN_LENGTH)
+            reduced = ' '.join(partials)
+            if count_tokens(reduced) >= count_tokens(text):
+                # Summaries are not shrinking the text; truncate rather than loop
+                text = _extractive_fallback(reduced, self.max_input_tokens)
+                break
+            text = reduced
+
+        result = self.summarize_batch([text], max_length, min(min_length, max_length))
+        return result[0] if result else None
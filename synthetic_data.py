@@ -0,0 +1,131 @@
+"""
+Synthetic Data Generator for Finance Bot Benchmarks
+Deterministic transactions, goals and chat histories at arbitrary scale
+"""
+
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from finance_analytics import CATEGORIES
+
+SCALES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+PAYMENT_METHODS = ["Credit Card", "Debit Card", "Cash", "Bank Transfer", "Digital Wallet"]
+
+GOAL_TYPES = ["Emergency Fund", "Vacation", "Car", "House", "Investment", "Education", "Other"]
+
+# Merchant names per category, biased towards the keywords the categorizers know
+MERCHANTS = {
+    "Food & Dining": ["Starbucks Coffee", "Joe's Pizza", "Burger Barn", "Thai Restaurant", "Whole Foods"],
+    "Transportation": ["Uber Trip", "Shell Gas Station", "City Parking", "Metro Train", "Yellow Taxi"],
+    "Shopping": ["Amazon Marketplace", "Target Store", "Walmart Supercenter", "Mall Outlet"],
+    "Entertainment": ["Netflix Subscription", "Spotify Premium", "AMC Movie Theater", "Steam Game"],
+    "Bills & Utilities": ["Electric Company Bill", "Water Utility", "Internet Provider", "Phone Bill"],
+    "Healthcare": ["CVS Pharmacy", "City Hospital", "Family Doctor", "Dental Health Clinic"],
+    "Travel": ["Delta Airlines", "Marriott Hotel", "Airbnb Stay", "Expedia Booking"],
+    "Education": ["Coursera Course", "University Bookstore", "Udemy Class", "Tuition Payment"],
+    "Other": ["Misc Purchase", "Gift Shop", "Charity Donation", "Pet Supplies"],
+}
+
+# Log-normal amount parameters (mu, sigma) per category
+AMOUNT_PROFILES = {
+    "Food & Dining": (2.8, 0.6),
+    "Transportation": (3.0, 0.7),
+    "Shopping": (3.6, 0.9),
+    "Entertainment": (2.7, 0.5),
+    "Bills & Utilities": (4.4, 0.4),
+    "Healthcare": (4.0, 1.0),
+    "Travel": (5.5, 0.8),
+    "Education": (4.8, 1.0),
+    "Other": (3.2, 0.9),
+}
+
+CHAT_QUESTIONS = [
+    "How should I budget my income?",
+    "What investment advice do you have for me?",
+    "How can I reduce my expenses?",
+    "How much did I spend on food last month?",
+    "Should I pay off debt or save first?",
+    "How big should my emergency fund be?",
+]
+
+
+def parse_scale(scale: str) -> int:
+    """Accept a named scale ('1k', '100k', '1m') or a plain integer"""
+    key = str(scale).lower()
+    if key in SCALES:
+        return SCALES[key]
+    return int(key)
+
+
+def generate_transactions(count: int, seed: int = 42, days: int = 365,
+                          end_date: datetime = datetime(2024, 12, 31)) -> List[Dict[str, Any]]:
+    """Transactions shaped like the ones created in show_expense_tracking"""
+    rng = random.Random(seed)
+    start = end_date - timedelta(days=days)
+    transactions = []
+    for i in range(count):
+        category = rng.choice(CATEGORIES)
+        mu, sigma = AMOUNT_PROFILES[category]
+        day = start + timedelta(days=rng.randrange(days + 1))
+        transactions.append({
+            'id': i + 1,
+            'merchant': rng.choice(MERCHANTS[category]),
+            'amount': round(max(0.01, rng.lognormvariate(mu, sigma)), 2),
+            'category': category,
+            'date': day.strftime('%Y-%m-%d'),
+            'payment_method': rng.choice(PAYMENT_METHODS),
+            'notes': '' if rng.random() < 0.8 else f"note {i}",
+            'timestamp': day.strftime('%Y-%m-%dT%H:%M:%S')
+        })
+    return transactions
+
+
+def generate_goals(count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Goals shaped like the ones created in show_financial_goals"""
+    rng = random.Random(seed)
+    goals = []
+    for i in range(count):
+        target = round(rng.uniform(500, 50_000), 2)
+        goals.append({
+            'id': i + 1,
+            'name': f"Goal {i + 1}",
+            'type': rng.choice(GOAL_TYPES),
+            'target_amount': target,
+            'current_amount': round(target * rng.random(), 2),
+            'target_date': (datetime(2025, 1, 1) + timedelta(days=rng.randrange(30, 1500))).strftime('%Y-%m-%d'),
+            'monthly_contribution': round(rng.uniform(0, 1000), 2),
+            'created_date': '2024-01-01'
+        })
+    return goals
+
+
+def generate_chat_history(turns: int, seed: int = 42) -> List[Dict[str, str]]:
+    """Alternating user/assistant messages"""
+    rng = random.Random(seed)
+    history = []
+    for _ in range(turns):
+        history.append({'role': 'user', 'content': rng.choice(CHAT_QUESTIONS)})
+        history.append({
+            'role': 'assistant',
+            'content': ' '.join(rng.choice(["Consider", "budgeting", "saving", "an", "emergency",
+                                             "fund", "with", "index", "funds", "and", "tracking",
+                                             "expenses", "monthly."]) for _ in range(rng.randint(15, 60)))
+        })
+    return history
+
+
+def generate_dataset(scale: str, seed: int = 42) -> Dict[str, Any]:
+    """Transactions at ``scale`` plus proportionally sized goals and chat history"""
+    count = parse_scale(scale)
+    return {
+        'transactions': generate_transactions(count, seed),
+        'goals': generate_goals(max(1, count // 1000), seed),
+        'chat_history': generate_chat_history(max(1, count // 100), seed),
+        'user_profile': {'name': 'Bench User', 'type': 'professional', 'balance': 12450.00}
+    }
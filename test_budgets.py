@@ -0,0 +1,90 @@
+"""
+Budget Tests
+Table-driven checks of threshold alerts, re-evaluation, limit changes and currency changes
+"""
+
+import pytest
+
+import pandas as pd
+
+from budgets import Budget, BudgetEngine
+
+AS_OF = '2024-05-15'
+
+
+def food_engine(limit=100.0):
+    return BudgetEngine([Budget('Food & Dining', 'monthly', limit)], currency='USD')
+
+
+def food(amount, day=AS_OF):
+    return {'category': 'Food & Dining', 'amount': amount, 'date': day}
+
+
+def history(*amounts):
+    return pd.DataFrame([food(amount, f"2024-05-{i + 1:02d}") for i, amount in enumerate(amounts)])
+
+
+def thresholds(alerts):
+    return [alert['threshold'] for alert in alerts]
+
+
+@pytest.mark.parametrize('transactions, expected', [
+    # Each threshold alerts once, on the transaction that crosses it
+    ([food(50), food(40), food(5), food(10), food(20)], [[], [0.8], [], [1.0], []]),
+    # Jumping past both thresholds alerts once, at the highest
+    ([food(120), food(10)], [[1.0], []]),
+    # A new month starts from nothing
+    ([food(90, '2024-05-10'), food(90, '2024-06-01')], [[0.8], [0.8]]),
+    # Categories without a budget never alert
+    ([{'category': 'Shopping', 'amount': 500, 'date': AS_OF}], [[]]),
+])
+def test_add_transaction_alerts_once_per_crossing(transactions, expected):
+    engine = food_engine()
+    assert [thresholds(engine.add_transaction(t)) for t in transactions] == expected
+
+
+@pytest.mark.parametrize('past, amount, expected', [
+    ((85,), 5, []),  # 0.8 was reached in the history
+    ((85,), 20, [1.0]),
+    ((30, 20), 35, [0.8]),
+    ((120,), 10, []),
+    ((), 80, [0.8]),
+])
+def test_reevaluate_marks_past_thresholds_as_alerted(past, amount, expected):
+    engine = food_engine()
+    engine.reevaluate(history(*past) if past else None)
+    assert thresholds(engine.add_transaction(food(amount))) == expected
+    assert engine.status(AS_OF)[0]['spent'] == pytest.approx(sum(past) + amount)
+
+
+@pytest.mark.parametrize('limit, amount, expected', [
+    (200.0, 80, [0.8]),  # 85 of 200 is under every threshold again
+    (90.0, 10, [1.0]),  # 85 of 90 already alerted at 0.8
+    (80.0, 1, []),  # 85 of 80 already over budget
+])
+def test_set_budget_rechecks_levels_when_the_limit_changes(limit, amount, expected):
+    engine = food_engine()
+    engine.add_transaction(food(85))
+    engine.set_budget(Budget('Food & Dining', 'monthly', limit))
+    assert engine.status(AS_OF)[0]['spent'] == 85
+    assert thresholds(engine.add_transaction(food(amount))) == expected
+
+
+def test_set_budget_evaluates_a_new_budget_against_the_history():
+    engine = food_engine()
+    engine.set_budget(Budget('Food & Dining', 'weekly', 50.0), history(10, 20, 45))
+    assert [(row['period'], row['spent']) for row in engine.status('2024-05-03')] == \
+        [('monthly', 0.0), ('weekly', 75.0)]
+
+
+@pytest.mark.parametrize('currency, rate, amounts, limit, spent, level', [
+    ('EUR', 0.9, (45, 45), 90.0, 90.0, 1.0),
+    ('JPY', 150.0, (10000,), 15000.0, 10000.0, 0.0),
+    ('GBP', 0.8, (), 80.0, 0.0, 0.0),
+])
+def test_change_currency_converts_limits_and_rebuilds_totals(currency, rate, amounts, limit, spent, level):
+    engine = food_engine()
+    engine.add_transaction(food(70))
+    engine.change_currency(currency, rate, history(*amounts) if amounts else None)
+    row = engine.status(AS_OF)[0]
+    assert (engine.currency, row['limit'], row['spent'], row['level']) == (currency, limit, spent, level)
@@ -0,0 +1,85 @@
+"""
+Currency Tests
+Table-driven checks of as-of rate lookup, reporting-currency conversion and user rates
+"""
+
+import math
+
+import pytest
+
+import pandas as pd
+
+from currency import FxRateTable, to_reporting_currency
+
+# USD per unit; EUR changes mid-year, GBP has a single rate
+TABLE = FxRateTable(pd.DataFrame([
+    {'date': '2024-01-01', 'currency': 'EUR', 'rate': 1.10},
+    {'date': '2024-07-01', 'currency': 'EUR', 'rate': 1.20},
+    {'date': '2024-03-01', 'currency': 'GBP', 'rate': 1.25},
+]), path=None)
+
+
+@pytest.mark.parametrize('currency, on, rate', [
+    ('USD', '2024-03-15', 1.0),
+    ('EUR', '2024-03-15', 1.10),  # latest rate on or before the date
+    ('EUR', '2024-07-01', 1.20),
+    ('EUR', '2025-01-01', 1.20),
+    ('EUR', '2023-06-01', 1.10),  # before the first rate: first rate
+    ('GBP', '2024-01-01', 1.25),
+    ('EUR', None, 1.20),  # undated: latest rates
+    ('GBP', None, 1.25),
+    ('USD', None, 1.0),
+    ('JPY', '2024-03-15', math.nan),  # no rates at all
+])
+def test_rates_asof(currency, on, rate):
+    result = TABLE.rates_asof(pd.Series([currency]), pd.to_datetime(pd.Series([on])))
+    assert result.iloc[0] == pytest.approx(rate, nan_ok=True)
+
+
+def test_rates_asof_keeps_the_input_order_and_index():
+    currencies = pd.Series(['EUR', 'USD', 'GBP', 'EUR', 'JPY'], index=[10, 3, 7, 1, 5])
+    dates = pd.to_datetime(pd.Series(['2024-08-01', '2024-01-01', None, '2023-01-01', '2024-01-01'],
+                                     index=currencies.index))
+    result = TABLE.rates_asof(currencies, dates)
+    assert list(result.index) == [10, 3, 7, 1, 5]
+    assert result.tolist()[:4] == pytest.approx([1.20, 1.0, 1.25, 1.10])
+    assert math.isnan(result.iloc[4])
+
+
+FRAME = pd.DataFrame([
+    {'merchant': 'Cafe', 'amount': 100.0, 'currency': 'EUR', 'date': '2024-03-15'},
+    {'merchant': 'Deli', 'amount': 50.0, 'currency': 'USD', 'date': '2024-03-15'},
+    {'merchant': 'Sushi', 'amount': 1000.0, 'currency': 'JPY', 'date': '2024-03-15'},
+])
+
+
+@pytest.mark.parametrize('currency, amounts', [
+    ('USD', [110.0, 50.0, 1000.0]),  # JPY has no rates and is left unconverted
+    ('EUR', [100.0, 50.0 / 1.10, 1000.0]),
+    ('GBP', [100.0 * 1.10 / 1.25, 50.0 / 1.25, 1000.0]),
+])
+def test_to_reporting_currency(currency, amounts):
+    out = to_reporting_currency(FRAME, currency, TABLE)
+    assert out['amount'].tolist() == pytest.approx(amounts)
+    assert out['original_amount'].tolist() == [100.0, 50.0, 1000.0]
+    assert out['currency'].tolist() == ['EUR', 'USD', 'JPY']
+
+
+def test_to_reporting_currency_of_no_transactions():
+    out = to_reporting_currency(pd.DataFrame(columns=['amount', 'date']), 'EUR', TABLE)
+    assert out.empty
+    assert {'amount', 'original_amount', 'currency'} <= set(out.columns)
+
+
+def test_user_rates_are_layered_over_the_bundled_file(tmp_path):
+    bundled, user = tmp_path / 'fx_rates.csv', tmp_path / 'fx_rates.user.csv'
+    bundled.write_text("date,currency,rate\n2024-01-01,EUR,1.10\n2024-01-01,GBP,1.25\n")
+    table = FxRateTable.load(str(bundled), str(user))
+    table.update(pd.DataFrame([{'date': '2024-01-01', 'currency': 'eur', 'rate': 1.5}]))
+    table.save()
+
+    reloaded = FxRateTable.load(str(bundled), str(user))
+    assert reloaded.rate('EUR', '2024-02-01') == 1.5
+    assert reloaded.rate('GBP', '2024-02-01') == 1.25
+    assert bundled.read_text() == "date,currency,rate\n2024-01-01,EUR,1.10\n2024-01-01,GBP,1.25\n"
+    assert pd.read_csv(user)['currency'].tolist() == ['EUR']
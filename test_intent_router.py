@@ -0,0 +1,96 @@
+"""
+Intent Router Tests
+Table-driven checks of question routing and period parsing
+"""
+
+from datetime import date
+
+import pytest
+
+import pandas as pd
+
+from intent_router import answer_query, parse_period, parse_query, prepare_frame
+
+TODAY = date(2024, 5, 15)  # a Wednesday
+
+
+@pytest.mark.parametrize('question', [
+    "How much is a good emergency fund?",
+    "What is the average credit score?",
+    "How much interest will I pay on a mortgage?",
+    "What's the average return of the S&P 500?",
+    "Is it worth paying off my biggest debt first?",
+    "How can I reduce my food expenses?",
+    "Should I spend less on travel this year?",
+    "What does a typical family spend on groceries?",
+    "How should I budget my income?",
+    "What is the biggest expense for most households?",
+])
+def test_general_questions_go_to_the_advice_model(question):
+    assert parse_query(question, today=TODAY) is None
+
+
+@pytest.mark.parametrize('question, aggregate, category, merchant, label', [
+    ("How much did I spend on food last month?", 'sum', 'Food & Dining', None, 'last month'),
+    ("How much did I spend this month?", 'sum', None, None, 'this month'),
+    ("How many transactions did I have this year?", 'count', None, None, 'this year'),
+    ("What was my biggest shopping expense in March?", 'max', 'Shopping', None, 'in March 2024'),
+    ("Which category did I spend the most on in the last 30 days?", 'top_category', None, None,
+     'in the last 30 days'),
+    ("Average transport cost last week?", 'average', 'Transportation', None, 'last week'),
+    ("Show my food expenses", 'sum', 'Food & Dining', None, ''),
+    ("Smallest purchase in 2023", 'min', None, None, 'in 2023'),
+    # Targets that are not categories are matched against merchant and notes, never dropped
+    ("How much did I spend on rent last month?", 'sum', None, 'rent', 'last month'),
+    ("What did I spend at Starbucks?", 'sum', None, 'starbucks', ''),
+    ("How much have I spent on my car?", 'sum', None, 'car', ''),
+    ("How much did I spend on coffee at Starbucks?", 'sum', 'Food & Dining', 'starbucks', ''),
+    ("How much did I spend for the whole year?", 'sum', None, None, ''),
+])
+def test_spending_questions_become_queries(question, aggregate, category, merchant, label):
+    query = parse_query(question, today=TODAY)
+    assert query is not None
+    assert (query.aggregate, query.category, query.merchant, query.period_label) == \
+        (aggregate, category, merchant, label)
+
+
+FRAME = prepare_frame(pd.DataFrame([
+    {'merchant': 'Starbucks', 'amount': 10.0, 'category': 'Food & Dining', 'date': '2024-04-10', 'notes': ''},
+    {'merchant': 'Landlord', 'amount': 1500.0, 'category': 'Other', 'date': '2024-04-01', 'notes': ''},
+    {'merchant': 'Jiffy Lube', 'amount': 80.0, 'category': 'Transportation', 'date': '2024-03-01',
+     'notes': 'Oil change for the car'},
+]))
+
+
+@pytest.mark.parametrize('question, answer', [
+    ("How much did I spend on rent last month?", 'You have no transactions matching "rent" last month.'),
+    ("What did I spend at Starbucks?",
+     'You spent $10.00 on transactions matching "starbucks" overall (1 transaction).'),
+    ("How much have I spent on my car?",
+     'You spent $80.00 on transactions matching "car" overall (1 transaction).'),
+    ("How much did I spend last month?", "You spent $1,510.00 last month (2 transactions)."),
+    ("How much did I spend on food last month?", "You spent $10.00 on Food & Dining last month (1 transaction)."),
+])
+def test_answers(question, answer):
+    assert answer_query(parse_query(question, today=TODAY), FRAME, 'USD') == answer
+
+
+@pytest.mark.parametrize('text, start, end, label', [
+    ("today", date(2024, 5, 15), date(2024, 5, 16), 'today'),
+    ("yesterday", date(2024, 5, 14), date(2024, 5, 15), 'yesterday'),
+    ("this week", date(2024, 5, 13), date(2024, 5, 16), 'this week'),
+    ("last week", date(2024, 5, 6), date(2024, 5, 13), 'last week'),
+    ("this month", date(2024, 5, 1), date(2024, 5, 16), 'this month'),
+    ("last month", date(2024, 4, 1), date(2024, 5, 1), 'last month'),
+    ("last year", date(2023, 1, 1), date(2024, 1, 1), 'last year'),
+    ("in the last 7 days", date(2024, 5, 9), date(2024, 5, 16), 'in the last 7 days'),
+    ("past 2 months", date(2024, 3, 16), date(2024, 5, 16), 'in the last 2 months'),
+    ("in march", date(2024, 3, 1), date(2024, 4, 1), 'in March 2024'),
+    ("in december", date(2023, 12, 1), date(2024, 1, 1), 'in December 2023'),
+    ("in feb 2020", date(2020, 2, 1), date(2020, 3, 1), 'in February 2020'),
+    ("in 2022", date(2022, 1, 1), date(2023, 1, 1), 'in 2022'),
+    ("may i see my spending", None, None, ''),
+    ("all my spending", None, None, ''),
+])
+def test_parse_period(text, start, end, label):
+    assert parse_period(text, TODAY) == (start, end, label)